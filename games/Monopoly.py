@@ -1,14 +1,28 @@
+import argparse
+from collections import deque
 import tkinter as tk
 from tkinter import messagebox
 import random
 
+from monopoly_ai import AssetTracker
+from profiling import counted, get_profiler
+from startup import mark_ready
+
+# 效能分析（設定環境變數 MINIGAME_PROFILE=1 開啟，F3 顯示統計）
+profiler = get_profiler("monopoly", __name__)
+
+# 電腦玩家每個動作之間的間隔（毫秒），以及畫面上保留幾行電腦的動作紀錄
+AI_DELAY_MS = 600
+AI_LOG_LINES = 6
+
 
 class Player:
-    def __init__(self, name, money=1500):
+    def __init__(self, name, money=1500, is_ai=False):
         self.name = name
         self.money = money
         self.position = 0
         self.alive = True
+        self.is_ai = is_ai  # 是否由電腦操作
 
     def move(self, steps, board_size):
         """玩家移動。如果超出棋盤格數，則從頭繞回。"""
@@ -55,14 +69,30 @@ def roll_dice():
     return random.randint(1, 6) + random.randint(1, 6)
 
 
+def create_board():
+    """建立示範用的 10 格小棋盤。"""
+    return [
+        Tile("起點", price=0, toll=0),
+        Tile("台北車站", price=100, toll=10),
+        Tile("中正紀念堂", price=200, toll=20),
+        Tile("免費停留", price=0, toll=0),
+        Tile("101大樓", price=300, toll=40),
+        Tile("龍山寺", price=150, toll=15),
+        Tile("淡水老街", price=200, toll=20),
+        Tile("免費停留", price=0, toll=0),
+        Tile("士林夜市", price=250, toll=30),
+        Tile("大安森林", price=350, toll=50),
+    ]
+
+
 class MonopolyGUI:
-    def __init__(self, master):
+    def __init__(self, master, computer_players=0):
         self.master = master
         self.master.title("大富翁小遊戲 - Tkinter版")
 
         # 建立玩家與棋盤資料
         self.players = []
-        self.board = self.create_board()
+        self.board = create_board()
         self.board_size = len(self.board)
         self.current_player_index = 0
         self.round_number = 1
@@ -70,6 +100,15 @@ class MonopolyGUI:
         # 先簡單地預設兩位玩家，你可以改寫成在 GUI 上輸入玩家資訊
         self.players.append(Player("玩家A"))
         self.players.append(Player("玩家B"))
+        # 最後 computer_players 位玩家改由電腦操作
+        if not 0 <= computer_players <= len(self.players):
+            raise ValueError(f"電腦玩家數必須在 0 到 {len(self.players)} 之間")
+        for p in self.players[len(self.players) - computer_players:]:
+            p.is_ai = True
+            p.name = "電腦" + p.name[-1]
+
+        # 電腦玩家決策用的快取（淨資產、過路費風險）
+        self.tracker = AssetTracker(self.board, self.players)
 
         # 建立主視窗的 Frame
         self.main_frame = tk.Frame(self.master)
@@ -93,6 +132,12 @@ class MonopolyGUI:
         self.info_label = tk.Label(self.info_frame, text="", font=("Arial", 12))
         self.info_label.pack()
 
+        # 電腦玩家的動作寫在這裡，不跳出對話框
+        self.ai_log = deque(maxlen=AI_LOG_LINES)
+        self.ai_log_label = tk.Label(self.info_frame, text="", font=("Arial", 10),
+                                     justify=tk.LEFT)
+        self.ai_log_label.pack()
+
         # 操作按鈕區域
         self.btn_frame = tk.Frame(self.main_frame)
         self.btn_frame.pack()
@@ -105,24 +150,25 @@ class MonopolyGUI:
         self.end_turn_button = tk.Button(self.btn_frame, text="結束回合", command=self.end_turn_action)
         self.end_turn_button.pack(side=tk.LEFT, padx=5)
 
+        # 效能統計（按 F3 顯示 / 隱藏）
+        self.profile_label = tk.Label(self.main_frame, text="", font=("Courier", 9),
+                                      justify=tk.LEFT)
+        self.master.bind("<F3>", self.toggle_profile_overlay)
+
         # 初始化畫面
         self.update_ui()
+        self.start_turn()
 
-    def create_board(self):
-        """建立示範用的 10 格小棋盤。"""
-        return [
-            Tile("起點", price=0, toll=0),
-            Tile("台北車站", price=100, toll=10),
-            Tile("中正紀念堂", price=200, toll=20),
-            Tile("免費停留", price=0, toll=0),
-            Tile("101大樓", price=300, toll=40),
-            Tile("龍山寺", price=150, toll=15),
-            Tile("淡水老街", price=200, toll=20),
-            Tile("免費停留", price=0, toll=0),
-            Tile("士林夜市", price=250, toll=30),
-            Tile("大安森林", price=350, toll=50),
-        ]
+    def toggle_profile_overlay(self, event=None):
+        """切換效能統計的顯示。"""
+        profiler.toggle_overlay()
+        if profiler.overlay:
+            self.profile_label.pack(pady=5)
+        else:
+            self.profile_label.pack_forget()
+        self.update_ui()
 
+    @counted
     def update_ui(self):
         """更新棋盤與玩家資訊顯示。"""
         # 更新棋盤格子的顯示
@@ -151,7 +197,7 @@ class MonopolyGUI:
         # 更新玩家資訊文字
         alive_players_str = []
         for p in self.players:
-            status = f"{p.name}: $ {p.money}"
+            status = f"{p.name}: $ {p.money}（淨資產 {self.tracker.net_worth(p)}）"
             if not p.alive:
                 status += " (破產)"
             alive_players_str.append(status)
@@ -161,14 +207,45 @@ class MonopolyGUI:
                      "\n".join(alive_players_str))
         self.info_label.config(text=info_text)
 
+        if profiler.overlay:
+            self.profile_label.config(text="\n".join(profiler.summary_lines()))
+
+    # ---------- 效能分析 ----------
+    # 每次按鈕事件算一個 frame：遊戲邏輯算 "update"，等待玩家按對話框算
+    # "input"，重畫介面算 "render"。
+
+    def show_info(self, title, text, player=None):
+        """顯示訊息；若是電腦玩家的動作，寫進動作紀錄而不跳出對話框。"""
+        if player is not None and player.is_ai:
+            self.ai_log.append(f"{title}：{text}")
+            self.ai_log_label.config(text="\n".join(self.ai_log))
+            return
+        profiler.mark("update")
+        messagebox.showinfo(title, text)
+        profiler.mark("input")
+
+    def ask_yes_no(self, title, text):
+        profiler.mark("update")
+        answer = messagebox.askyesno(title, text)
+        profiler.mark("input")
+        return answer
+
+    def render_frame(self):
+        """結束這次事件的遊戲邏輯，重畫介面並記錄這個 frame。"""
+        profiler.mark("update")
+        self.update_ui()
+        profiler.mark("render")
+        profiler.end_frame()
+
     def roll_dice_action(self):
         """點擊擲骰子按鈕時，觸發此事件。"""
         current_player = self.players[self.current_player_index]
         if not current_player.alive:
             return  # 若玩家已破產，不操作
+        profiler.begin_frame()
 
         dice_value = roll_dice()
-        messagebox.showinfo("擲骰子", f"{current_player.name} 擲出了 {dice_value} 點！")
+        self.show_info("擲骰子", f"{current_player.name} 擲出了 {dice_value} 點！", current_player)
 
         # 移動玩家
         old_position = current_player.position
@@ -182,29 +259,32 @@ class MonopolyGUI:
         def buy_callback(tile, player):
             """當需要詢問玩家是否購買土地時的回呼函式。"""
             if player.money < tile.price:
-                messagebox.showinfo("無法購買", f"{player.name} 資金不足，無法購買 {tile.name}")
+                self.show_info("無法購買", f"{player.name} 資金不足，無法購買 {tile.name}", player)
                 return
-            # 跳出對話框，詢問是否購買
-            buy = messagebox.askyesno("購買土地", f"{player.name} 要購買 {tile.name} 嗎？\n價格: {tile.price}")
+            if player.is_ai:
+                # 電腦玩家直接查表決定
+                buy = self.tracker.should_buy(player, tile)
+            else:
+                # 跳出對話框，詢問是否購買
+                buy = self.ask_yes_no("購買土地", f"{player.name} 要購買 {tile.name} 嗎？\n價格: {tile.price}")
             if buy:
                 player.pay(tile.price)
-                tile.owner = player
-                messagebox.showinfo("成功購買", f"{player.name} 購買了 {tile.name}！")
+                self.tracker.set_owner(tile, player)
+                self.show_info("成功購買", f"{player.name} 購買了 {tile.name}！", player)
 
         landed_tile.landed_on(current_player, buy_callback)
 
         # 若繳過路費後破產，釋放該玩家土地
         if not current_player.alive:
-            messagebox.showinfo("破產退場", f"{current_player.name} 無法支付費用，已破產！")
+            self.show_info("破產退場", f"{current_player.name} 無法支付費用，已破產！", current_player)
             # 釋放該玩家所有地產
-            for tile in self.board:
-                if tile.owner == current_player:
-                    tile.owner = None
+            self.tracker.release_all(current_player)
 
-        self.update_ui()
+        self.render_frame()
 
     def end_turn_action(self):
         """結束回合，換下一位玩家。"""
+        profiler.begin_frame()
         # 切換到下一位玩家
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
         self.round_number += 1
@@ -213,20 +293,46 @@ class MonopolyGUI:
         alive_players = [p for p in self.players if p.alive]
         if len(alive_players) == 1:
             winner = alive_players[0]
-            messagebox.showinfo("遊戲結束", f"最後的贏家是：{winner.name}")
+            self.show_info("遊戲結束", f"最後的贏家是：{winner.name}")
+            profiler.end_frame()
             # 結束整個視窗
             self.master.destroy()
             return
 
         # 更新介面
-        self.update_ui()
+        self.render_frame()
+        self.start_turn()
+
+    def start_turn(self):
+        """輪到電腦玩家時自動進行，並停用按鈕避免誤按。"""
+        is_ai = self.players[self.current_player_index].is_ai
+        state = tk.DISABLED if is_ai else tk.NORMAL
+        self.roll_button.config(state=state)
+        self.end_turn_button.config(state=state)
+        if is_ai:
+            self.master.after(AI_DELAY_MS, self.ai_turn)
+
+    def ai_turn(self):
+        """電腦玩家的回合：擲骰子（已破產則跳過），然後結束回合。"""
+        self.roll_dice_action()
+        self.end_turn_action()
 
 
-def main():
+def main(computer_players=0):
     root = tk.Tk()
-    app = MonopolyGUI(root)
+    app = MonopolyGUI(root, computer_players)
+    mark_ready()
     root.mainloop()
 
 
+def main_vs_computer():
+    """與電腦對戰（玩家B 由電腦操作）。"""
+    main(computer_players=1)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="大富翁小遊戲")
+    parser.add_argument("--ai", type=int, default=0, choices=range(0, 3), metavar="N",
+                        help="由電腦操作的玩家數（0-2）")
+    args = parser.parse_args()
+    main(computer_players=args.ai)
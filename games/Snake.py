@@ -1,25 +1,37 @@
 import pygame
+import os
 import sys
 import random
 
+from rpg_content import load_content
+from rpg_entities import EntityStore, KIND_MONSTER, KIND_NPC
+from rpg_path import LandmarkFields, find_path
+from rpg_save import SaveJournal
+from profiling import counted, get_profiler
+from startup import mark_ready, open_window
+
 # =======================
 #     Data Classes
 # =======================
 
 class Player:
-    def __init__(self, name="Hero", hp=50, atk=10, gold=50):
+    __slots__ = ("name", "hp", "max_hp", "atk", "gold", "inventory")
+
+    def __init__(self, name="Hero", hp=50, atk=10, gold=50, inventory=None):
         self.name = name
         self.hp = hp
         self.max_hp = hp
         self.atk = atk
         self.gold = gold
-        # Default inventory with 1 "Healing Potion"
-        self.inventory = {"Healing Potion": 1}
+        # Inventory maps item id -> count
+        self.inventory = dict(inventory) if inventory else {}
 
     def is_alive(self):
         return self.hp > 0
 
 class Monster:
+    __slots__ = ("name", "hp", "max_hp", "atk", "gold_drop")
+
     def __init__(self, name, hp, atk, gold_drop):
         self.name = name
         self.hp = hp
@@ -34,8 +46,6 @@ class Monster:
 #      Game Settings
 # =======================
 
-pygame.init()
-
 # Window size: 5x5 tiles, each tile is 64x64, plus an info panel at the bottom
 TILE_SIZE = 64
 MAP_WIDTH = 5
@@ -45,11 +55,13 @@ INFO_PANEL_HEIGHT = 120
 WINDOW_WIDTH = MAP_WIDTH * TILE_SIZE
 WINDOW_HEIGHT = MAP_HEIGHT * TILE_SIZE + INFO_PANEL_HEIGHT
 
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Pygame RPG Example (English Version)")
+# Window and fonts are created by init_display(), not at import time
+screen = None
+font = None
+overlay_font = None
 
-# Font (use a default system font)
-font = pygame.font.SysFont(None, 24)
+# Opt-in frame profiler (MINIGAME_PROFILE=1), F3 toggles the overlay
+profiler = get_profiler("rpg", __name__)
 
 # Colors (R, G, B)
 COLOR_BG       = (30, 30, 30)      # Background
@@ -59,6 +71,7 @@ COLOR_TOWN     = (100, 149, 237)   # Town tile
 COLOR_DUNGEON  = (139, 69, 19)     # Dungeon tile
 COLOR_EMPTY    = (60, 60, 60)      # Empty tile
 COLOR_MONSTER  = (255, 0, 0)       # Monster indicator (battle)
+COLOR_NPC      = (255, 215, 0)     # Roaming NPC marker
 
 clock = pygame.time.Clock()
 
@@ -75,21 +88,37 @@ GAME_MAP = [
     ['.', '.', '.', '.', '.']
 ]
 
+# Items, monsters, shops and encounter tables, compiled from games/data/*.json
+CONTENT = load_content()
+
 player_pos = [0, 0]  # Starting position (row, col)
-player = Player()
-
-SHOP_ITEMS = {
-    "Healing Potion": 10,
-    "Strong Potion": 25,
-}
-
-MONSTER_LIST = [
-    Monster("Slime", 20, 5, 10),
-    Monster("Goblin", 30, 8, 15),
-    Monster("Bat", 15, 6, 8),
-    Monster("Imp", 25, 7, 12),
+player = Player(inventory=CONTENT.starting_items)
+
+# Items sold in town, bought with keys 1..9
+SHOP_ITEMS = CONTENT.shops["town"]
+
+NPC_LINES = [
+    "Traveler: The dungeon is dangerous, stock up on potions!",
 ]
 
+# Roaming entities on the map (monsters and NPCs)
+ROAMING_MONSTER_COUNT = 2
+ROAMING_NPC_COUNT = 1
+# Only entities within this many tiles of the player get AI updates
+AI_RADIUS = 8
+# Monsters this close to the player chase them instead of wandering
+CHASE_RADIUS = 2
+
+entities = EntityStore(MAP_HEIGHT, MAP_WIDTH)
+
+# Cached distance fields towards towns / dungeons, used by auto-travel
+landmarks = LandmarkFields(GAME_MAP)
+
+# Remaining steps of the current auto-travel, as (row, col) tiles
+travel_path = []
+AUTO_TRAVEL_DELAY_MS = 150
+last_travel_step = 0
+
 # =======================
 #     Game State Enum
 # =======================
@@ -100,6 +129,21 @@ STATE_BATTLE = 3   # In battle
 
 game_state = STATE_MAP
 current_monster = None
+current_monster_eid = None  # Entity id of a roaming monster in battle, if any
+
+# =======================
+#   Player Actions / Save
+# =======================
+# Every state change caused by the player goes through do_action(), which
+# journals it first so a saved game can be replayed after a crash.
+ACTION_MOVE = 1           # a=drow, b=dcol
+ACTION_ENTER_DUNGEON = 2
+ACTION_BATTLE = 3         # a=battle command (1=attack, 2=item, 3=run)
+ACTION_BUY = 4            # a=item id
+ACTION_LEAVE_TOWN = 5
+
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")
+journal = SaveJournal(SAVE_DIR)
 
 # Message lines to display at the bottom
 message_lines = []
@@ -116,6 +160,7 @@ def add_message(text):
 #      Drawing Helpers
 # =======================
 
+@counted
 def draw_map():
     """
     Draw the map tiles and the player marker.
@@ -138,6 +183,16 @@ def draw_map():
     py = player_pos[0] * TILE_SIZE
     pygame.draw.rect(screen, COLOR_PLAYER, (px, py, TILE_SIZE, TILE_SIZE))
 
+    # Draw roaming entities that are on screen
+    marker = TILE_SIZE // 2
+    offset = (TILE_SIZE - marker) // 2
+    for eid in entities.grid.candidates(0, 0, MAP_HEIGHT - 1, MAP_WIDTH - 1):
+        color = COLOR_MONSTER if entities.kind[eid] == KIND_MONSTER else COLOR_NPC
+        ex = entities.col[eid] * TILE_SIZE + offset
+        ey = entities.row[eid] * TILE_SIZE + offset
+        pygame.draw.rect(screen, color, (ex, ey, marker, marker))
+
+@counted
 def draw_info_panel():
     """
     Draw the bottom info panel, including player's HP, gold, inventory, and messages.
@@ -149,7 +204,8 @@ def draw_info_panel():
     # Player info
     hp_text = f"HP: {player.hp}/{player.max_hp}"
     gold_text = f"GOLD: {player.gold}"
-    inv_text = "INVENTORY: " + ", ".join([f"{k}x{v}" for k, v in player.inventory.items()])
+    inv_text = "INVENTORY: " + ", ".join([f"{CONTENT.item_names[k]}x{v}"
+                                          for k, v in player.inventory.items()])
 
     # Draw the text
     draw_text(hp_text, 10, panel_y + 10, COLOR_TEXT)
@@ -162,6 +218,7 @@ def draw_info_panel():
         draw_text(line, 10, line_y, COLOR_TEXT)
         line_y += 20
 
+@counted
 def draw_battle(monster):
     """
     Draw a simple battle screen: monster in the center, both HP displayed.
@@ -199,34 +256,154 @@ def move_player(drow, dcol):
         player_pos[0] = new_r
         player_pos[1] = new_c
 
+def is_open_tile(r, c):
+    """
+    Roaming entities only walk on empty tiles, never on the player.
+    """
+    return GAME_MAP[r][c] == '.' and (r != player_pos[0] or c != player_pos[1])
+
+def spawn_roaming_entities():
+    """
+    Scatter roaming monsters and NPCs over free empty tiles.
+    """
+    free_tiles = [(r, c) for r in range(MAP_HEIGHT) for c in range(MAP_WIDTH)
+                  if is_open_tile(r, c)]
+    random.shuffle(free_tiles)
+    for _ in range(ROAMING_MONSTER_COUNT):
+        if not free_tiles:
+            return
+        r, c = free_tiles.pop()
+        monster_id = CONTENT.sample_encounter("overworld")
+        entities.spawn(KIND_MONSTER, r, c, monster_id, CONTENT.monster_hp[monster_id])
+    for _ in range(ROAMING_NPC_COUNT):
+        if not free_tiles:
+            return
+        r, c = free_tiles.pop()
+        entities.spawn(KIND_NPC, r, c, random.randrange(len(NPC_LINES)))
+
+def chase_step(r, c):
+    """
+    Next step of a monster at (r, c) towards the player. The search never
+    leaves the CHASE_RADIUS window around the player, so its cost does
+    not depend on the map size.
+    """
+    pr, pc = player_pos
+
+    def walkable(tr, tc):
+        return (abs(tr - pr) <= CHASE_RADIUS and abs(tc - pc) <= CHASE_RADIUS
+                and GAME_MAP[tr][tc] == '.')
+
+    path = find_path((r, c), (pr, pc), MAP_HEIGHT, MAP_WIDTH, walkable)
+    return path[0] if path else None
+
+def update_entities():
+    """
+    Advance the AI of entities near the player by one tick.
+    Monsters close to the player chase them with a bounded A* search; on
+    the open map, one that catches the player starts a battle.
+    """
+    target = tuple(player_pos) if game_state == STATE_MAP else None
+    attackers = entities.update(player_pos[0], player_pos[1], AI_RADIUS, is_open_tile,
+                                step_toward=chase_step, chase_radius=CHASE_RADIUS,
+                                target=target)
+    if attackers:
+        start_roaming_battle(attackers[0])
+
+def set_map_tile(r, c, tile):
+    """
+    Change a map tile, keeping the cached travel distance fields valid.
+    """
+    landmarks.set_tile(r, c, tile)
+
+def start_travel_to_nearest(landmark, name):
+    """
+    Plan an auto-travel path to the nearest tile of type `landmark`.
+    """
+    travel_path.clear()
+    r, c = player_pos
+    step = landmarks.next_step(landmark, r, c)
+    while step is not None:
+        travel_path.append(step)
+        step = landmarks.next_step(landmark, *step)
+    if travel_path:
+        add_message(f"Travelling to the nearest {name}...")
+    elif GAME_MAP[r][c] != landmark:
+        add_message(f"There is no {name} you can reach.")
+
+def start_travel_to(r, c):
+    """
+    Plan an auto-travel path to the clicked tile with A*.
+    """
+    travel_path.clear()
+    path = find_path(player_pos, (r, c), MAP_HEIGHT, MAP_WIDTH,
+                     lambda tr, tc: GAME_MAP[tr][tc] == '.')
+    if path is None:
+        add_message("You can't find a way there.")
+    else:
+        travel_path.extend(path)
+
+def advance_travel():
+    """
+    Take the next auto-travel step. Travel stops as soon as something
+    happens (town, dungeon, battle).
+    """
+    r, c = travel_path.pop(0)
+    do_action(ACTION_MOVE, r - player_pos[0], c - player_pos[1])
+    if game_state != STATE_MAP:
+        travel_path.clear()
+
+@counted
 def check_tile_event():
     """
     After moving, check the current tile and possibly change game state.
+    Unless a battle starts, nearby entities then take their turn.
     """
     global game_state
     r, c = player_pos
     tile = GAME_MAP[r][c]
+
+    for eid in entities.at(r, c):
+        if entities.kind[eid] == KIND_MONSTER:
+            start_roaming_battle(eid)
+            return
+        add_message(NPC_LINES[entities.template[eid]])
+
     if tile == 'T':
-        add_message("You arrived at a Town. (Press 1/2 to buy items, ESC to leave)")
+        add_message(f"You arrived at a Town. (Press 1-{min(len(SHOP_ITEMS), 9)} to buy items, ESC to leave)")
         game_state = STATE_TOWN
     elif tile == 'D':
         add_message("You stepped into a Dungeon...")
         game_state = STATE_DUNGEON
     else:
         game_state = STATE_MAP
+    update_entities()
+
+def start_roaming_battle(eid):
+    """
+    Fight the roaming monster `eid`, keeping the wounds it already has.
+    """
+    global game_state, current_monster, current_monster_eid
+    current_monster = make_monster(entities.template[eid])
+    current_monster.hp = entities.hp[eid]
+    current_monster_eid = eid
+    add_message(f"A roaming {current_monster.name} attacks! (Battle...)")
+    game_state = STATE_BATTLE
+
+def make_monster(monster_id):
+    """
+    Create a fresh Monster from the content tables.
+    """
+    return Monster(CONTENT.monster_names[monster_id], CONTENT.monster_hp[monster_id],
+                   CONTENT.monster_atk[monster_id], CONTENT.monster_gold[monster_id])
 
 def enter_dungeon():
     """
     In the dungeon: 80% chance to encounter a monster. If encountered, switch to battle.
     """
-    global game_state, current_monster
+    global game_state, current_monster, current_monster_eid
     if random.random() < 0.8:
-        current_monster = Monster(*random.choice([
-            ("Slime", 20, 5, 10),
-            ("Goblin", 30, 8, 15),
-            ("Bat", 15, 6, 8),
-            ("Imp", 25, 7, 12),
-        ]))
+        current_monster_eid = None
+        current_monster = make_monster(CONTENT.sample_encounter("dungeon"))
         add_message(f"A wild {current_monster.name} appears! (Battle...)")
         game_state = STATE_BATTLE
     else:
@@ -261,6 +438,9 @@ def battle(monster, command):
     elif command == '3':
         # Run away
         add_message("You successfully ran away!")
+        if current_monster_eid is not None:
+            # The roaming monster keeps its wounds
+            entities.hp[current_monster_eid] = monster.hp
         game_state = STATE_MAP
         return
 
@@ -268,6 +448,8 @@ def battle(monster, command):
     if not monster.is_alive():
         add_message(f"You defeated {monster.name} and gained {monster.gold_drop} gold!")
         player.gold += monster.gold_drop
+        if current_monster_eid is not None:
+            entities.despawn(current_monster_eid)
         game_state = STATE_MAP
     elif not player.is_alive():
         add_message(f"You were defeated by {monster.name}...")
@@ -277,97 +459,243 @@ def battle(monster, command):
 
 def use_item_in_battle():
     """
-    Example: tries to use a 'Strong Potion' if available, otherwise use a 'Healing Potion'.
-    """
-    if "Strong Potion" in player.inventory and player.inventory["Strong Potion"] > 0:
-        heal_amount = 40
-        player.hp = min(player.hp + heal_amount, player.max_hp)
-        player.inventory["Strong Potion"] -= 1
-        if player.inventory["Strong Potion"] <= 0:
-            del player.inventory["Strong Potion"]
-        add_message(f"You used a Strong Potion and restored {heal_amount} HP.")
-    elif "Healing Potion" in player.inventory and player.inventory["Healing Potion"] > 0:
-        heal_amount = 20
-        player.hp = min(player.hp + heal_amount, player.max_hp)
-        player.inventory["Healing Potion"] -= 1
-        if player.inventory["Healing Potion"] <= 0:
-            del player.inventory["Healing Potion"]
-        add_message(f"You used a Healing Potion and restored {heal_amount} HP.")
-    else:
-        add_message("You have no potions to use!")
-
-def buy_item(item_name):
+    Use the strongest healing item in the inventory, if any.
+    """
+    for item_id in CONTENT.heal_order:
+        if player.inventory.get(item_id, 0) > 0:
+            heal_amount = CONTENT.item_heal[item_id]
+            player.hp = min(player.hp + heal_amount, player.max_hp)
+            player.inventory[item_id] -= 1
+            if player.inventory[item_id] <= 0:
+                del player.inventory[item_id]
+            add_message(f"You used a {CONTENT.item_names[item_id]} and restored {heal_amount} HP.")
+            return
+    add_message("You have no potions to use!")
+
+def buy_item(item_id):
     """
     Attempt to purchase an item in town.
     """
-    price = SHOP_ITEMS[item_name]
+    price = CONTENT.item_price[item_id]
+    item_name = CONTENT.item_names[item_id]
     if player.gold >= price:
         player.gold -= price
-        if item_name in player.inventory:
-            player.inventory[item_name] += 1
+        if item_id in player.inventory:
+            player.inventory[item_id] += 1
         else:
-            player.inventory[item_name] = 1
+            player.inventory[item_id] = 1
         add_message(f"You bought a {item_name} for {price} gold.")
     else:
         add_message("Not enough gold to buy this item.")
 
+def apply_action(action, a=0, b=0):
+    """
+    Apply one player action to the game state.
+    """
+    global game_state
+    if action == ACTION_MOVE:
+        move_player(a, b)
+        check_tile_event()
+    elif action == ACTION_ENTER_DUNGEON:
+        enter_dungeon()
+    elif action == ACTION_BATTLE:
+        battle(current_monster, str(a))
+    elif action == ACTION_BUY:
+        buy_item(a)
+    elif action == ACTION_LEAVE_TOWN:
+        add_message("You left the town.")
+        game_state = STATE_MAP
+
+def do_action(action, a=0, b=0):
+    """
+    Journal a player action, apply it, and snapshot when one is due.
+    Purchases and anything that changes the game state (entering a town,
+    ending a battle...) ask the journal's writer thread to fsync right away.
+    """
+    old_state = game_state
+    snapshot_due = journal.record(action, a, b, sync=action == ACTION_BUY)
+    apply_action(action, a, b)
+    if snapshot_due:
+        journal.write_snapshot(save_state())
+    elif game_state != old_state:
+        journal.sync()
+
+def handle_key(key):
+    """
+    Turn one key press into a player action for the current game state.
+    """
+    if game_state == STATE_MAP:
+        # Movement on the map (any key cancels auto-travel)
+        travel_path.clear()
+        if key in (pygame.K_w, pygame.K_UP):
+            do_action(ACTION_MOVE, -1, 0)
+        elif key in (pygame.K_s, pygame.K_DOWN):
+            do_action(ACTION_MOVE, 1, 0)
+        elif key in (pygame.K_a, pygame.K_LEFT):
+            do_action(ACTION_MOVE, 0, -1)
+        elif key in (pygame.K_d, pygame.K_RIGHT):
+            do_action(ACTION_MOVE, 0, 1)
+        elif key == pygame.K_t:
+            start_travel_to_nearest('T', "Town")
+        elif key == pygame.K_g:
+            start_travel_to_nearest('D', "Dungeon")
+
+    elif game_state == STATE_TOWN:
+        # Town shop: 1..9 -> buy the matching shop item, ESC -> leave
+        slot = key - pygame.K_1
+        if 0 <= slot < min(len(SHOP_ITEMS), 9):
+            do_action(ACTION_BUY, SHOP_ITEMS[slot])
+        elif key == pygame.K_ESCAPE:
+            do_action(ACTION_LEAVE_TOWN)
+
+    elif game_state == STATE_DUNGEON:
+        # Trigger dungeon encounter once
+        do_action(ACTION_ENTER_DUNGEON)
+
+    elif game_state == STATE_BATTLE and current_monster:
+        # Battle commands: 1=Attack, 2=Use item, 3=Run
+        if key == pygame.K_1:
+            do_action(ACTION_BATTLE, 1)
+        elif key == pygame.K_2:
+            do_action(ACTION_BATTLE, 2)
+        elif key == pygame.K_3:
+            do_action(ACTION_BATTLE, 3)
+
+def save_state():
+    """
+    Collect everything needed to resume the game into plain data.
+    """
+    monster = None
+    if current_monster is not None:
+        monster = {slot: getattr(current_monster, slot) for slot in Monster.__slots__}
+    return {
+        "player": {slot: getattr(player, slot) for slot in Player.__slots__},
+        "player_pos": list(player_pos),
+        "game_state": game_state,
+        "current_monster": monster,
+        "current_monster_eid": current_monster_eid,
+        "entities": entities.dump(),
+        "map": ["".join(row) for row in GAME_MAP],
+        "messages": list(message_lines),
+        # Replaying the journal needs the same random rolls
+        "rng": random.getstate(),
+    }
+
+def load_state(state):
+    """
+    Restore the game from a save_state() result.
+    """
+    global game_state, current_monster, current_monster_eid
+    for slot, value in state["player"].items():
+        setattr(player, slot, value)
+    player_pos[:] = state["player_pos"]
+    game_state = state["game_state"]
+    current_monster = None
+    if state["current_monster"] is not None:
+        current_monster = Monster("", 0, 0, 0)
+        for slot, value in state["current_monster"].items():
+            setattr(current_monster, slot, value)
+    current_monster_eid = state["current_monster_eid"]
+    entities.load(state["entities"])
+    for r, row in enumerate(state["map"]):
+        for c, tile in enumerate(row):
+            set_map_tile(r, c, tile)
+    message_lines[:] = state["messages"]
+    random.setstate(state["rng"])
+
+def restore_game():
+    """
+    Load the latest snapshot and replay the journal tail.
+    Returns False if there is no saved game.
+    """
+    state, actions = journal.load()
+    if state is None:
+        return False
+    load_state(state)
+    for action in actions:
+        apply_action(*action)
+    return True
+
+def reset_game():
+    """
+    Put every piece of game state back to a brand-new game.
+    """
+    global player, game_state, current_monster, current_monster_eid, entities
+    player = Player(inventory=CONTENT.starting_items)
+    player_pos[:] = [0, 0]
+    game_state = STATE_MAP
+    current_monster = None
+    current_monster_eid = None
+    entities = EntityStore(MAP_HEIGHT, MAP_WIDTH)
+    message_lines.clear()
+    travel_path.clear()
+
 # =======================
 #     Main Game Loop
 # =======================
+def init_display():
+    """
+    Open (or reuse) the game window and load the fonts.
+    """
+    global screen, font, overlay_font
+    screen = open_window((WINDOW_WIDTH, WINDOW_HEIGHT), "Pygame RPG Example (English Version)")
+    # Font (use a default system font)
+    font = pygame.font.SysFont(None, 24)
+    overlay_font = pygame.font.SysFont(None, 16)
+
 def main():
-    global game_state
+    global last_travel_step
 
-    add_message("Game start! Use WASD or arrow keys to move, Q to quit.")
+    init_display()
+    reset_game()
+    if restore_game():
+        add_message("Saved game restored.")
+    else:
+        add_message("Game start! Use WASD or arrow keys to move, Q to quit.")
+        add_message("T/G: travel to nearest Town/Dungeon, or click a tile.")
+        spawn_roaming_entities()
+    # Start a fresh snapshot so the next restore has nothing to replay
+    journal.write_snapshot(save_state())
+    mark_ready()
 
     running = True
     while running:
         clock.tick(30)  # 30 FPS
+        profiler.begin_frame()
+        # Input: collect the player's keys and clicks, applied below
+        pending = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                pending.append(event)
             elif event.type == pygame.KEYDOWN:
                 # Q to quit
                 if event.key == pygame.K_q:
                     running = False
-
-                # Handle states
-                if game_state == STATE_MAP:
-                    # Movement on the map
-                    if event.key in (pygame.K_w, pygame.K_UP):
-                        move_player(-1, 0)
-                        check_tile_event()
-                    elif event.key in (pygame.K_s, pygame.K_DOWN):
-                        move_player(1, 0)
-                        check_tile_event()
-                    elif event.key in (pygame.K_a, pygame.K_LEFT):
-                        move_player(0, -1)
-                        check_tile_event()
-                    elif event.key in (pygame.K_d, pygame.K_RIGHT):
-                        move_player(0, 1)
-                        check_tile_event()
-
-                elif game_state == STATE_TOWN:
-                    # Town shop: 1 -> Healing Potion, 2 -> Strong Potion, ESC -> leave
-                    if event.key == pygame.K_1:
-                        buy_item("Healing Potion")
-                    elif event.key == pygame.K_2:
-                        buy_item("Strong Potion")
-                    elif event.key == pygame.K_ESCAPE:
-                        add_message("You left the town.")
-                        game_state = STATE_MAP
-
-                elif game_state == STATE_DUNGEON:
-                    # Trigger dungeon encounter once
-                    enter_dungeon()
-
-                elif game_state == STATE_BATTLE and current_monster:
-                    # Battle commands: 1=Attack, 2=Use item, 3=Run
-                    if event.key == pygame.K_1:
-                        battle(current_monster, '1')
-                    elif event.key == pygame.K_2:
-                        battle(current_monster, '2')
-                    elif event.key == pygame.K_3:
-                        battle(current_monster, '3')
+                # F3 toggles the profiler overlay
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                else:
+                    pending.append(event)
+        profiler.mark("input")
+
+        # Update: apply them in order (each may change the game state)
+        for event in pending:
+            if event.type == pygame.KEYDOWN:
+                handle_key(event.key)
+            elif game_state == STATE_MAP:
+                # Click a map tile to auto-travel there
+                mx, my = event.pos
+                if my < MAP_HEIGHT * TILE_SIZE:
+                    start_travel_to(my // TILE_SIZE, mx // TILE_SIZE)
+
+        # Auto-travel, one tile every AUTO_TRAVEL_DELAY_MS
+        now = pygame.time.get_ticks()
+        if travel_path and game_state == STATE_MAP and now - last_travel_step >= AUTO_TRAVEL_DELAY_MS:
+            last_travel_step = now
+            advance_travel()
+        profiler.mark("update")
 
         # Drawing
         screen.fill(COLOR_BG)
@@ -378,17 +706,25 @@ def main():
             draw_battle(current_monster)
 
         draw_info_panel()
+        profiler.draw_overlay(screen, overlay_font)
         pygame.display.flip()
+        profiler.mark("render")
+        profiler.end_frame()
 
         # Check if player is dead
         if player.hp <= 0:
             add_message("Your hero has fallen... Game Over.")
             pygame.display.flip()
             pygame.time.wait(2000)
+            # A fallen hero's save is gone for good
+            journal.clear()
             running = False
 
-    pygame.quit()
-    sys.exit()
+    if player.hp > 0:
+        journal.write_snapshot(save_state())
+    journal.close()
 
 if __name__ == "__main__":
     main()
+    pygame.quit()
+    sys.exit()
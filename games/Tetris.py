@@ -2,8 +2,8 @@ import pygame
 import sys
 import random
 
-# 初始化 Pygame
-pygame.init()
+from profiling import counted, get_profiler
+from startup import mark_ready, open_window
 
 # 遊戲格子寬度與高度（以格數計，非像素）
 GRID_WIDTH = 10
@@ -16,6 +16,9 @@ BLOCK_SIZE = 30
 SCREEN_WIDTH = GRID_WIDTH * BLOCK_SIZE
 SCREEN_HEIGHT = GRID_HEIGHT * BLOCK_SIZE
 
+# 效能分析（設定環境變數 MINIGAME_PROFILE=1 開啟，F3 顯示統計）
+profiler = get_profiler("tetris", __name__)
+
 # 設定顏色（RGB）
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -89,12 +92,12 @@ class Piece:
         self.shape = rotate_shape(self.shape)
 
 
-def create_grid(locked_positions):
+def create_grid(locked_positions, width=GRID_WIDTH, height=GRID_HEIGHT):
     """
     建立遊戲網格，將已鎖定的方塊位置在網格中標示。
     grid[row][col] 以顏色或 None 代表該格狀態。
     """
-    grid = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+    grid = [[BLACK for _ in range(width)] for _ in range(height)]
 
     for (col, row), color in locked_positions.items():
         if row >= 0:
@@ -102,10 +105,14 @@ def create_grid(locked_positions):
     return grid
 
 
+@counted
 def valid_space(piece, grid):
     # 檢查方塊是否在網格範圍內，且未與已鎖定的方塊重疊
+    # （棋盤大小直接取自 grid，因此可用於任意大小的棋盤）
+    height = len(grid)
+    width = len(grid[0])
     for x, y in piece.get_positions():
-        if x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT:
+        if x < 0 or x >= width or y < 0 or y >= height:
             return False
         if grid[y][x] != BLACK:  # 代表該格已被填上（非空格）
             return False
@@ -124,149 +131,409 @@ def clear_rows(grid, locked_positions):
     """
     消除已填滿的橫行，
     並回傳消除的行數（可用於加分或難度增長）。
+    每個方塊只搬移一次：往下移的距離 = 它下方被消除的行數。
     """
-    cleared = 0
-    for row in range(GRID_HEIGHT):
-        if BLACK not in grid[row]:  # 該行沒有空格，代表已滿
-            cleared += 1
-            # 刪除該行
-            for col in range(GRID_WIDTH):
-                del locked_positions[(col, row)]
-            # 將更上方的行都向下移一行
-            for (col, r) in sorted(list(locked_positions), key=lambda x: x[1])[::-1]:
-                if r < row:
-                    locked_positions[(col, r + 1)] = locked_positions.pop((col, r))
-    return cleared
+    full_rows = [row for row in range(len(grid)) if BLACK not in grid[row]]
+    if not full_rows:
+        return 0
+    full = set(full_rows)
+    remaining = {}
+    for (col, row), color in locked_positions.items():
+        if row in full:
+            continue  # 刪除該行
+        shift = sum(1 for r in full_rows if r > row)
+        remaining[(col, row + shift)] = color
+    locked_positions.clear()
+    locked_positions.update(remaining)
+    return len(full_rows)
 
 
-def draw_window(screen, grid, score=0):
-    screen.fill(BLACK)
-    # 繪製網格方塊
-    for row_idx in range(GRID_HEIGHT):
-        for col_idx in range(GRID_WIDTH):
-            color = grid[row_idx][col_idx]
-            pygame.draw.rect(
-                screen,
-                color,
-                (col_idx * BLOCK_SIZE, row_idx * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE),
-                0
-            )
+# 字型只建立一次（SysFont 每次呼叫都要搜尋系統字型，非常慢）
+_fonts = {}
+
+
+def get_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.SysFont("Arial", size)
+    return font
+
+
+def draw_board(surface, grid, score=0, block_size=BLOCK_SIZE):
+    """
+    在 surface 上畫出棋盤（已鎖定的方塊、格線與分數），不更新螢幕。
+    """
+    height = len(grid)
+    width = len(grid[0])
+    surface.fill(BLACK)
+    # 繪製網格方塊（空格就是背景色，不必重畫）
+    for row_idx in range(height):
+        row = grid[row_idx]
+        for col_idx in range(width):
+            color = row[col_idx]
+            if color != BLACK:
+                pygame.draw.rect(
+                    surface,
+                    color,
+                    (col_idx * block_size, row_idx * block_size, block_size, block_size),
+                    0
+                )
     # 繪製格線
-    for x in range(GRID_WIDTH + 1):
+    for x in range(width + 1):
         pygame.draw.line(
-            screen,
+            surface,
             GRAY,
-            (x * BLOCK_SIZE, 0),
-            (x * BLOCK_SIZE, SCREEN_HEIGHT)
+            (x * block_size, 0),
+            (x * block_size, height * block_size)
         )
-    for y in range(GRID_HEIGHT + 1):
+    for y in range(height + 1):
         pygame.draw.line(
-            screen,
+            surface,
             GRAY,
-            (0, y * BLOCK_SIZE),
-            (SCREEN_WIDTH, y * BLOCK_SIZE)
+            (0, y * block_size),
+            (width * block_size, y * block_size)
         )
     # 顯示分數
-    font = pygame.font.SysFont("Arial", 24)
-    text = font.render(f"Score: {score}", True, WHITE)
-    screen.blit(text, (10, 10))
+    text = get_font(24).render(f"Score: {score}", True, WHITE)
+    surface.blit(text, (10, 10))
 
+
+def draw_window(screen, grid, score=0):
+    draw_board(screen, grid, score)
     pygame.display.update()
 
 
-def main():
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("簡易俄羅斯方塊")
+class Board:
+    """
+    一個獨立的俄羅斯方塊棋盤：大小、方塊、分數與下落計時都屬於這個物件，
+    因此同一個視窗裡可以同時有好幾個棋盤（對戰模式）。
+    """
 
-    locked_positions = {}  # {(x, y): color}
-    grid = create_grid(locked_positions)
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, block_size=BLOCK_SIZE, rng=random):
+        self.width = width
+        self.height = height
+        self.block_size = block_size
+        self.rng = rng
+        self.locked_positions = {}  # {(x, y): color}
+        self.grid = create_grid(self.locked_positions, width, height)
+        self.current_piece = self.new_piece()
+        self.next_piece = self.new_piece()
+        self.fall_time = 0
+        self.fall_speed = 0.5  # 方塊下落速度（秒數可自行調整）
+        self.score = 0
+        self.lost = False
+        self.pending_garbage = 0  # 對手送來、下次鎖定時要加入的垃圾行數
+
+        # 棋盤畫面只在方塊鎖定時重畫，其餘時間直接貼上快取的圖
+        self.surface = None
+        self.dirty = True
+
+    def new_piece(self):
+        return Piece(self.width // 2 - 2, 0, self.rng.choice(SHAPES))
+
+    def move(self, dx, dy):
+        """移動目前的方塊；若移動後位置無效就退回，並回傳 False。"""
+        self.current_piece.x += dx
+        self.current_piece.y += dy
+        if not valid_space(self.current_piece, self.grid):
+            self.current_piece.x -= dx
+            self.current_piece.y -= dy
+            return False
+        return True
 
-    current_piece = Piece(GRID_WIDTH // 2 - 2, 0, random.choice(SHAPES))
-    next_piece = Piece(GRID_WIDTH // 2 - 2, 0, random.choice(SHAPES))
+    def rotate(self):
+        self.current_piece.rotate()
+        if not valid_space(self.current_piece, self.grid):
+            # 旋轉後無效，轉回去
+            # 反向旋轉三次 = 順時針旋轉一次的逆操作
+            for _ in range(3):
+                self.current_piece.rotate()
+
+    def update(self, dt):
+        """
+        經過 dt 毫秒後控制方塊下落；方塊落地時鎖定，回傳這次消除的行數。
+        """
+        self.fall_time += dt
+        if self.fall_time / 1000 >= self.fall_speed:
+            self.fall_time = 0
+            if not self.move(0, 1):
+                return self.lock_piece()
+        return 0
+
+    def lock_piece(self):
+        # 鎖定當前方塊
+        for x, y in self.current_piece.get_positions():
+            self.locked_positions[(x, y)] = self.current_piece.color
+        # 消除行（用包含剛鎖定方塊的網格判斷）
+        self.grid = create_grid(self.locked_positions, self.width, self.height)
+        cleared = clear_rows(self.grid, self.locked_positions)
+        if cleared > 0:
+            self.score += cleared * 100
+        if self.pending_garbage:
+            self.apply_garbage(self.pending_garbage)
+            self.pending_garbage = 0
+        self.grid = create_grid(self.locked_positions, self.width, self.height)
+        self.dirty = True
+
+        # 切換下一個方塊
+        self.current_piece = self.next_piece
+        self.next_piece = self.new_piece()
+        # 如果方塊被推出頂端，或新方塊一出現就重疊，遊戲結束
+        if check_lost(self.locked_positions) or not valid_space(self.current_piece, self.grid):
+            self.lost = True
+        return cleared
+
+    def add_garbage(self, lines):
+        """收到對手送來的垃圾行，會在下一次鎖定方塊時加入。"""
+        self.pending_garbage += lines
+
+    def apply_garbage(self, lines):
+        # 所有方塊往上推，底部補上只留一個缺口的灰色垃圾行
+        hole = self.rng.randrange(self.width)
+        shifted = {(col, row - lines): color
+                   for (col, row), color in self.locked_positions.items()}
+        for row in range(self.height - lines, self.height):
+            for col in range(self.width):
+                if col != hole:
+                    shifted[(col, row)] = GRAY
+        self.locked_positions = shifted
+
+    @counted
+    def draw(self, screen, left=0, top=0):
+        """把棋盤與下落中的方塊畫在 screen 的 (left, top)，不更新螢幕。"""
+        bs = self.block_size
+        if self.dirty or self.surface is None:
+            if self.surface is None:
+                self.surface = pygame.Surface((self.width * bs, self.height * bs))
+            draw_board(self.surface, self.grid, self.score, bs)
+            self.dirty = False
+        screen.blit(self.surface, (left, top))
+        # 繪製「正在下落」的方塊
+        for x, y in self.current_piece.get_positions():
+            if y >= 0:  # 在螢幕範圍內再繪圖
+                pygame.draw.rect(
+                    screen,
+                    self.current_piece.color,
+                    (left + x * bs, top + y * bs, bs, bs),
+                    0
+                )
 
+
+def main():
+    # 開啟視窗（第一次執行時才初始化 Pygame，之後沿用已開啟的視窗）
+    screen = open_window((SCREEN_WIDTH, SCREEN_HEIGHT), "簡易俄羅斯方塊")
+
+    board = Board()
     clock = pygame.time.Clock()
-    fall_time = 0
-    fall_speed = 0.5  # 方塊下落速度（秒數可自行調整）
-    score = 0
-
-    run = True
-    while run:
-        grid = create_grid(locked_positions)
-        fall_time += clock.get_rawtime()
+    overlay_font = get_font(14)
+    mark_ready()
+
+    while not board.lost:
+        profiler.begin_frame()
+        dt = clock.get_rawtime()
         clock.tick()
 
-        # 控制方塊下落
-        if fall_time / 1000 >= fall_speed:
-            fall_time = 0
-            current_piece.y += 1
-            if not valid_space(current_piece, grid):
-                current_piece.y -= 1
-                # 鎖定當前方塊
-                for x, y in current_piece.get_positions():
-                    locked_positions[(x, y)] = current_piece.color
-                # 消除行
-                cleared_rows = clear_rows(grid, locked_positions)
-                if cleared_rows > 0:
-                    score += cleared_rows * 100
-                # 切換下一個方塊
-                current_piece = next_piece
-                next_piece = Piece(GRID_WIDTH // 2 - 2, 0, random.choice(SHAPES))
-                # 如果遊戲結束
-                if check_lost(locked_positions):
-                    run = False
-
-        # 處理事件
+        # 處理事件（只收集動作，下面的更新階段才套用）
+        actions = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                # 關閉視窗只結束這場遊戲，由呼叫端決定是否結束 Pygame
+                return
 
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    current_piece.x -= 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x += 1
-                elif event.key == pygame.K_RIGHT:
-                    current_piece.x += 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x -= 1
-                elif event.key == pygame.K_DOWN:
-                    current_piece.y += 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.y -= 1
-                elif event.key == pygame.K_UP:
-                    current_piece.rotate()
-                    if not valid_space(current_piece, grid):
-                        # 旋轉後無效，轉回去
-                        # 反向旋轉三次 = 順時針旋轉一次的逆操作
-                        for _ in range(3):
-                            current_piece.rotate()
-
-        draw_window(screen, grid, score=score)
-        # 繪製「正在下落」的方塊
-        for x, y in current_piece.get_positions():
-            if y >= 0:  # 在螢幕範圍內再繪圖
-                pygame.draw.rect(
-                    screen,
-                    current_piece.color,
-                    (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE),
-                    0
-                )
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                elif event.key in KEYMAPS[0]:
+                    actions.append(KEYMAPS[0][event.key])
+        profiler.mark("input")
+
+        # 套用動作，並控制方塊下落
+        for action in actions:
+            do_board_action(board, action)
+        board.update(dt)
+        profiler.mark("update")
+
+        board.draw(screen)
+        profiler.draw_overlay(screen, overlay_font)
         pygame.display.update()
+        profiler.mark("render")
+        profiler.end_frame()
 
     # 結束畫面
     screen.fill(BLACK)
-    font = pygame.font.SysFont("Arial", 48)
-    text = font.render("Game Over", True, WHITE)
+    text = get_font(48).render("Game Over", True, WHITE)
     screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2,
                        SCREEN_HEIGHT // 2 - text.get_height() // 2))
     pygame.display.update()
     pygame.time.delay(2000)
 
 
+# =======================
+#        對戰模式
+# =======================
+
+# 每位玩家的按鍵：左、右、下、旋轉。沒有分配到按鍵的棋盤由電腦隨機操作
+KEYMAPS = [
+    {pygame.K_LEFT: "left", pygame.K_RIGHT: "right", pygame.K_DOWN: "down", pygame.K_UP: "rotate"},
+    {pygame.K_a: "left", pygame.K_d: "right", pygame.K_s: "down", pygame.K_w: "rotate"},
+    {pygame.K_j: "left", pygame.K_l: "right", pygame.K_k: "down", pygame.K_i: "rotate"},
+    {pygame.K_KP4: "left", pygame.K_KP6: "right", pygame.K_KP5: "down", pygame.K_KP8: "rotate"},
+]
+BOT_MOVE_MS = 150
+
+MAX_WINDOW_WIDTH = 1600
+MAX_WINDOW_HEIGHT = 900
+BOARD_GAP = 10
+BOARDS_PER_ROW = 4
+
+
+def do_board_action(board, action):
+    if action == "left":
+        board.move(-1, 0)
+    elif action == "right":
+        board.move(1, 0)
+    elif action == "down":
+        board.move(0, 1)
+    elif action == "rotate":
+        board.rotate()
+
+
+def send_garbage(boards, attacker, cleared):
+    """一次消除 n 行（n >= 2）時，送 n - 1 行垃圾給下一位還在場上的玩家。"""
+    if cleared < 2:
+        return
+    count = len(boards)
+    for step in range(1, count):
+        target = boards[(attacker + step) % count]
+        if not target.lost:
+            target.add_garbage(cleared - 1)
+            return
+
+
+def versus_layout(num_boards, width, height):
+    """依照棋盤數量算出格子大小、每個棋盤的左上角位置與視窗大小。"""
+    cols = min(num_boards, BOARDS_PER_ROW)
+    rows = (num_boards + cols - 1) // cols
+    block_size = min(BLOCK_SIZE,
+                     (MAX_WINDOW_WIDTH - BOARD_GAP * (cols + 1)) // (cols * width),
+                     (MAX_WINDOW_HEIGHT - BOARD_GAP * (rows + 1)) // (rows * height))
+    block_size = max(block_size, 4)
+    positions = [(BOARD_GAP + (i % cols) * (width * block_size + BOARD_GAP),
+                  BOARD_GAP + (i // cols) * (height * block_size + BOARD_GAP))
+                 for i in range(num_boards)]
+    window = (BOARD_GAP + cols * (width * block_size + BOARD_GAP),
+              BOARD_GAP + rows * (height * block_size + BOARD_GAP))
+    return block_size, positions, window
+
+
+def versus_main(num_boards=2, width=GRID_WIDTH, height=GRID_HEIGHT, humans=None):
+    """
+    多人對戰：同一個視窗裡有 num_boards 個棋盤，
+    前 humans 個由鍵盤操作（預設每組按鍵一位），其餘由電腦操作。
+    """
+    if num_boards < 2:
+        raise ValueError("對戰模式至少需要 2 個棋盤")
+    # 玩家數不能超過棋盤數，也不能超過按鍵組數
+    if humans is None:
+        humans = num_boards
+    humans = max(0, min(humans, num_boards, len(KEYMAPS)))
+    block_size, positions, window = versus_layout(num_boards, width, height)
+    screen = open_window(window, "俄羅斯方塊對戰")
+
+    boards = [Board(width, height, block_size) for _ in range(num_boards)]
+    bot_time = [0] * num_boards
+    clock = pygame.time.Clock()
+    overlay_font = get_font(14)
+    mark_ready()
+
+    while sum(not board.lost for board in boards) > 1:
+        dt = clock.tick(60)
+        profiler.begin_frame()
+
+        # 處理事件（只收集 (棋盤, 動作)，下面的更新階段才套用）
+        actions = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                # 關閉視窗只結束這場遊戲，由呼叫端決定是否結束 Pygame
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                for i in range(humans):
+                    action = KEYMAPS[i].get(event.key)
+                    if action:
+                        actions.append((i, action))
+        profiler.mark("input")
+
+        # 套用玩家與電腦的動作
+        for i, action in actions:
+            if not boards[i].lost:
+                do_board_action(boards[i], action)
+        for i in range(humans, num_boards):
+            bot_time[i] += dt
+            if bot_time[i] >= BOT_MOVE_MS and not boards[i].lost:
+                bot_time[i] = 0
+                do_board_action(boards[i], random.choice(("left", "right", "down", "rotate")))
+
+        # 控制方塊下落並交換垃圾行
+        for i, board in enumerate(boards):
+            if not board.lost:
+                send_garbage(boards, i, board.update(dt))
+        profiler.mark("update")
+
+        screen.fill(BLACK)
+        for board, (left, top) in zip(boards, positions):
+            board.draw(screen, left, top)
+            if board.lost:
+                text = get_font(24).render("Game Over", True, WHITE)
+                screen.blit(text, (left + 10, top + 40))
+        profiler.draw_overlay(screen, overlay_font)
+        pygame.display.update()
+        profiler.mark("render")
+        profiler.end_frame()
+
+    # 結束畫面：顯示贏家
+    winner = next((i for i, board in enumerate(boards) if not board.lost), None)
+    message = f"Player {winner + 1} wins!" if winner is not None else "Draw"
+    text = get_font(48).render(message, True, WHITE)
+    screen.blit(text, (window[0] // 2 - text.get_width() // 2,
+                       window[1] // 2 - text.get_height() // 2))
+    pygame.display.update()
+    pygame.time.delay(2000)
+
+
 def main_menu():
     main()
 
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    import argparse
+
+    def board_count(text):
+        n = int(text)
+        if n < 2:
+            raise argparse.ArgumentTypeError("對戰模式至少需要 2 個棋盤")
+        return n
+
+    def board_size(text):
+        try:
+            w, h = (int(n) for n in text.lower().split("x"))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"棋盤大小要寫成 寬x高（例如 40x20），不是 '{text}'") from None
+        if w < 4 or h < 2:
+            raise argparse.ArgumentTypeError("棋盤至少要 4 格寬、2 格高")
+        return w, h
+
+    parser = argparse.ArgumentParser(description="簡易俄羅斯方塊")
+    parser.add_argument("--versus", type=board_count, metavar="N", help="N 個棋盤的對戰模式（N >= 2）")
+    parser.add_argument("--size", type=board_size, default=f"{GRID_WIDTH}x{GRID_HEIGHT}",
+                        help="對戰模式的棋盤大小，寬x高（例如 40x20）")
+    parser.add_argument("--humans", type=int, help="由鍵盤操作的玩家數")
+    args = parser.parse_args()
+    if args.versus:
+        w, h = args.size
+        versus_main(args.versus, w, h, args.humans)
+    else:
+        main_menu()
+    pygame.quit()
+    sys.exit()
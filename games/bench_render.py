@@ -0,0 +1,220 @@
+"""
+Headless rendering benchmark and golden-frame check.
+
+Draws Tetris boards, a Tetris versus match and RPG scenes of several
+sizes into off-screen surfaces with the SDL dummy video driver (no
+monitor needed), reports frames per second, and compares a SHA-256 of a
+reference frame of every scene with golden_frames.json:
+
+    python games/bench_render.py                   # benchmark + compare
+    python games/bench_render.py --update-golden   # accept current frames
+    python games/bench_render.py --save-frames out # also write PNGs
+
+All text is drawn with pygame's bundled font rather than system fonts,
+so the frames are the same on every machine. Exits with status 1 when a
+frame does not match its golden hash.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import Snake
+import Tetris
+from rpg_entities import EntityStore, KIND_MONSTER, KIND_NPC
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_frames.json")
+
+TETRIS_SIZES = [(10, 20), (20, 40), (40, 80)]   # (columns, rows)
+RPG_SIZES = [(5, 5), (10, 10), (20, 20)]        # (columns, rows)
+
+
+@contextlib.contextmanager
+def patched(module, **values):
+    """
+    Temporarily replace module-level settings (board / map sizes).
+    """
+    old = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in old.items():
+            setattr(module, name, value)
+
+
+def tetris_scene(cols, rows):
+    """
+    A board with the bottom half filled by a fixed pseudo-random pattern.
+    """
+    rng = random.Random(cols * 1000 + rows)
+    locked = {(x, y): Tetris.WHITE
+              for y in range(rows // 2, rows) for x in range(cols) if rng.random() < 0.6}
+    surface = pygame.Surface((cols * Tetris.BLOCK_SIZE, rows * Tetris.BLOCK_SIZE))
+
+    def draw():
+        grid = Tetris.create_grid(locked, cols, rows)
+        Tetris.draw_window(surface, grid, score=1200)
+    return surface, {}, draw
+
+
+def tetris_versus_scene(num_boards, cols, rows):
+    """
+    Full versus-mode frames: bot input, gravity, garbage and drawing of
+    every board, advancing 1/60 s per frame.
+    """
+    rng = random.Random(num_boards * 1000 + cols)
+    block_size, positions, window = Tetris.versus_layout(num_boards, cols, rows)
+    boards = [Tetris.Board(cols, rows, block_size, rng=random.Random(i)) for i in range(num_boards)]
+    surface = pygame.Surface(window)
+    actions = ("left", "right", "down", "rotate")
+
+    def draw():
+        for i, board in enumerate(boards):
+            if board.lost:
+                # Keep the benchmark running with a fresh board
+                board = boards[i] = Tetris.Board(cols, rows, block_size, rng=random.Random(i))
+            if rng.random() < 0.1:
+                Tetris.do_board_action(board, rng.choice(actions))
+            Tetris.send_garbage(boards, i, board.update(1000 / 60))
+        surface.fill(Tetris.BLACK)
+        for board, (left, top) in zip(boards, positions):
+            board.draw(surface, left, top)
+    return surface, {}, draw
+
+
+def rpg_scene(cols, rows, battle=False):
+    """
+    A map with towns, dungeons and roaming entities, or the battle screen.
+    """
+    rng = random.Random(cols * 1000 + rows)
+    game_map = [[rng.choice("....TD") for _ in range(cols)] for _ in range(rows)]
+    entities = EntityStore(rows, cols)
+    for _ in range(cols * rows // 8):
+        entities.spawn(rng.choice((KIND_MONSTER, KIND_NPC)),
+                       rng.randrange(rows), rng.randrange(cols), 0, 10)
+    width = cols * Snake.TILE_SIZE
+    surface = pygame.Surface((width, rows * Snake.TILE_SIZE + Snake.INFO_PANEL_HEIGHT))
+    settings = dict(MAP_WIDTH=cols, MAP_HEIGHT=rows, WINDOW_WIDTH=width,
+                    GAME_MAP=game_map, entities=entities, screen=surface,
+                    player_pos=[rows // 2, cols // 2])
+    monster = Snake.make_monster(0)
+
+    def draw():
+        surface.fill(Snake.COLOR_BG)
+        if battle:
+            Snake.draw_battle(monster)
+        else:
+            Snake.draw_map()
+        Snake.draw_info_panel()
+    return surface, settings, draw
+
+
+def scenes():
+    """
+    Yield (name, module, scene factory, frames drawn before hashing).
+    Animated scenes are hashed after a fixed number of frames of a fresh
+    copy, so the golden does not depend on --frames.
+    """
+    for cols, rows in TETRIS_SIZES:
+        yield f"tetris-{cols}x{rows}", Tetris, lambda c=cols, r=rows: tetris_scene(c, r), 1
+    yield "tetris-versus-8x40x20", Tetris, lambda: tetris_versus_scene(8, 40, 20), 300
+    for cols, rows in RPG_SIZES:
+        yield f"rpg-map-{cols}x{rows}", Snake, lambda c=cols, r=rows: rpg_scene(c, r), 1
+    yield "rpg-battle-5x5", Snake, lambda: rpg_scene(5, 5, battle=True), 1
+
+
+_bundled_fonts = {}
+
+
+def bundled_font(size):
+    """
+    pygame's built-in font: unlike SysFont it does not depend on which
+    fonts the machine has installed.
+    """
+    font = _bundled_fonts.get(size)
+    if font is None:
+        font = _bundled_fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+def frame_hash(surface):
+    return hashlib.sha256(pygame.image.tostring(surface, "RGB")).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200, help="frames timed per scene")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="store the current frames as the new goldens")
+    parser.add_argument("--save-frames", metavar="DIR", help="write each frame as PNG")
+    args = parser.parse_args()
+
+    # draw_window() calls display.update(), which needs a (dummy) display
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+    # Platform-independent text for the golden frames
+    Tetris.get_font = bundled_font
+    Snake.font = bundled_font(24)
+    Snake.player = Snake.Player(inventory=Snake.CONTENT.starting_items)
+
+    try:
+        with open(GOLDEN_FILE, encoding="utf-8") as f:
+            golden = json.load(f)
+    except OSError:
+        golden = {}
+
+    failures = 0
+    print(f"{'scene':<24}{'fps':>10}{'ms/frame':>10}  golden")
+    for name, module, make_scene, golden_frames in scenes():
+        surface, settings, draw = make_scene()
+        with patched(module, **settings):
+            draw()  # Warm up (font cache, first blits)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                draw()
+            elapsed = time.perf_counter() - start
+
+        surface, settings, draw = make_scene()
+        with patched(module, **settings):
+            for _ in range(golden_frames):
+                draw()
+            digest = frame_hash(surface)
+
+        if args.save_frames:
+            os.makedirs(args.save_frames, exist_ok=True)
+            pygame.image.save(surface, os.path.join(args.save_frames, name + ".png"))
+        if args.update_golden:
+            golden[name] = digest
+            status = "updated"
+        elif name not in golden:
+            status = "missing"
+        elif golden[name] == digest:
+            status = "ok"
+        else:
+            status = "MISMATCH"
+            failures += 1
+        print(f"{name:<24}{args.frames / elapsed:>10.1f}"
+              f"{elapsed * 1000 / args.frames:>10.2f}  {status}")
+
+    if args.update_golden:
+        with open(GOLDEN_FILE, "w", encoding="utf-8") as f:
+            json.dump(golden, f, indent=2, sort_keys=True)
+            f.write("\n")
+    pygame.quit()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
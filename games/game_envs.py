@@ -0,0 +1,505 @@
+"""
+Gym-style vectorized environments for Tetris and the RPG.
+
+Each environment class simulates `num_envs` independent games in
+lockstep with NumPy arrays (one row per game), so a single step() call
+advances every game at once without any rendering or event loop:
+
+    env = TetrisVecEnv(num_envs=256, seed=0)
+    obs = env.reset()
+    obs, reward, done, info = env.step(actions)   # actions: int array (num_envs,)
+
+Finished games are reset automatically; their final score is reported in
+info["final_score"]. SubprocVecEnv spreads the games over worker
+processes that write straight into shared-memory observation buffers.
+
+reset() and step() return the same obs / reward / done arrays on every
+call, overwritten in place, so stepping allocates nothing. Copy them
+(e.g. obs.copy()) before keeping them past the next step(), for example
+in a replay buffer.
+
+Requires NumPy (pip install numpy).
+"""
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import Snake
+import Tetris
+
+
+def _make_buffers(num_envs, obs_shape, obs_dtype):
+    return {
+        "obs": np.zeros((num_envs,) + obs_shape, dtype=obs_dtype),
+        "reward": np.zeros(num_envs, dtype=np.float32),
+        "done": np.zeros(num_envs, dtype=np.bool_),
+    }
+
+
+# =======================
+#        Tetris
+# =======================
+
+def _shape_cells():
+    """
+    (shape, rotation, cell, (dy, dx)) offsets for every shape and all four
+    rotations, following Piece.get_positions() and rotate_shape().
+    """
+    cells = np.zeros((len(Tetris.SHAPES), 4, 4, 2), dtype=np.int64)
+    for s, shape in enumerate(Tetris.SHAPES):
+        for r in range(4):
+            offsets = [(row_idx, col_idx)
+                       for row_idx, row in enumerate(shape)
+                       for col_idx, val in enumerate(row) if val == "X"]
+            cells[s, r] = offsets
+            shape = Tetris.rotate_shape(shape)
+    return cells
+
+
+class TetrisVecEnv:
+    """
+    Tetris rules from games/Tetris.py, vectorized over `num_envs` boards.
+
+    Actions match the game's arrow keys: 0 noop, 1 left, 2 right,
+    3 down, 4 rotate. After the action every piece falls one row, as one
+    gravity tick of the interactive game. The reward is the game's score
+    increase (100 per cleared row). A game ends when a new piece cannot
+    be placed.
+
+    Observation: uint8 (num_envs, height, width), 0 empty, 1 locked
+    block, 2 falling piece. The board size defaults to the game's.
+    """
+    NOOP, LEFT, RIGHT, DOWN, ROTATE = range(5)
+    num_actions = 5
+
+    def __init__(self, num_envs, seed=None, max_steps=None, buffers=None,
+                 width=Tetris.GRID_WIDTH, height=Tetris.GRID_HEIGHT):
+        self.num_envs = num_envs
+        self.height = height
+        self.width = width
+        self.max_steps = max_steps
+        self.obs_shape = (self.height, self.width)
+        self.obs_dtype = np.uint8
+        self.rng = np.random.default_rng(seed)
+        self.cells = _shape_cells()
+
+        self.boards = np.zeros((num_envs, self.height, self.width), dtype=np.uint8)
+        self.piece = np.zeros(num_envs, dtype=np.int64)
+        self.next_piece = np.zeros(num_envs, dtype=np.int64)
+        self.rot = np.zeros(num_envs, dtype=np.int64)
+        self.x = np.zeros(num_envs, dtype=np.int64)
+        self.y = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.buffers = buffers or _make_buffers(num_envs, self.obs_shape, self.obs_dtype)
+
+    def _positions(self, piece, rot, x, y):
+        offsets = self.cells[piece, rot]                  # (k, 4, 2)
+        return y[:, None] + offsets[..., 0], x[:, None] + offsets[..., 1]
+
+    def _valid(self, idx, piece, rot, x, y):
+        """
+        Vectorized valid_space(): in bounds and not overlapping.
+        """
+        cy, cx = self._positions(piece, rot, x, y)
+        inside = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+        occupied = self.boards[idx[:, None],
+                               np.clip(cy, 0, self.height - 1),
+                               np.clip(cx, 0, self.width - 1)]
+        return (inside & (occupied == 0)).all(axis=1)
+
+    def _spawn(self, idx):
+        """
+        Bring in the next piece for `idx`; returns which spawns collided.
+        """
+        self.piece[idx] = self.next_piece[idx]
+        self.next_piece[idx] = self.rng.integers(len(Tetris.SHAPES), size=len(idx))
+        self.rot[idx] = 0
+        self.x[idx] = self.width // 2 - 2
+        self.y[idx] = 0
+        return ~self._valid(idx, self.piece[idx], self.rot[idx], self.x[idx], self.y[idx])
+
+    def _reset_envs(self, idx):
+        self.boards[idx] = 0
+        self.score[idx] = 0
+        self.steps[idx] = 0
+        self.next_piece[idx] = self.rng.integers(len(Tetris.SHAPES), size=len(idx))
+        self._spawn(idx)
+
+    def _write_obs(self):
+        obs = self.buffers["obs"]
+        np.copyto(obs, self.boards)
+        idx = np.arange(self.num_envs)
+        cy, cx = self._positions(self.piece, self.rot, self.x, self.y)
+        visible = (cy >= 0) & (cy < self.height) & (cx >= 0) & (cx < self.width)
+        rows = np.broadcast_to(idx[:, None], cy.shape)
+        obs[rows[visible], cy[visible], cx[visible]] = 2
+        return obs
+
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        self.buffers["reward"][:] = 0
+        self.buffers["done"][:] = False
+        return self._write_obs()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        idx = np.arange(self.num_envs)
+        reward = self.buffers["reward"]
+        done = self.buffers["done"]
+        reward[:] = 0
+        done[:] = False
+
+        # Player input: at most one of move / soft drop / rotate
+        nx = self.x - (actions == self.LEFT) + (actions == self.RIGHT)
+        ny = self.y + (actions == self.DOWN)
+        nrot = (self.rot + (actions == self.ROTATE)) % 4
+        ok = self._valid(idx, self.piece, nrot, nx, ny)
+        self.x = np.where(ok, nx, self.x)
+        self.y = np.where(ok, ny, self.y)
+        self.rot = np.where(ok, nrot, self.rot)
+
+        # Gravity: fall one row, or lock where the piece cannot move down
+        can_fall = self._valid(idx, self.piece, self.rot, self.x, self.y + 1)
+        self.y += can_fall
+        lock = idx[~can_fall]
+        if len(lock):
+            cy, cx = self._positions(self.piece[lock], self.rot[lock],
+                                     self.x[lock], self.y[lock])
+            self.boards[np.broadcast_to(lock[:, None], cy.shape), cy, cx] = 1
+
+            full = self.boards[lock].all(axis=2)          # (k, height)
+            cleared = full.sum(axis=1)
+            for i in np.flatnonzero(cleared):
+                env = lock[i]
+                kept = self.boards[env][~full[i]]
+                self.boards[env] = 0
+                self.boards[env, self.height - len(kept):] = kept
+            reward[lock] = cleared * 100
+            self.score[lock] += cleared * 100
+            done[lock] = self._spawn(lock)
+
+        self.steps += 1
+        if self.max_steps is not None:
+            done |= self.steps >= self.max_steps
+
+        info = {}
+        finished = np.flatnonzero(done)
+        if len(finished):
+            info["final_score"] = dict(zip(finished.tolist(), self.score[finished].tolist()))
+            self._reset_envs(finished)
+        return self._write_obs(), reward, done, info
+
+
+# =======================
+#          RPG
+# =======================
+
+class RPGVecEnv:
+    """
+    The RPG rules from games/Snake.py (map, town shop, dungeon encounters
+    and battles), vectorized over `num_envs` heroes. Roaming monsters and
+    NPCs are not simulated.
+
+    Actions: 0-3 move up/down/left/right, 4 attack, 5 use item,
+    6 run away / leave town, 7 + k buy shop item k. As in the game, any
+    action while standing in a dungeon rolls for an encounter. The reward
+    is the gold dropped by defeated monsters; a game ends when the hero
+    dies.
+
+    Observation: int32 (num_envs, 9 + item count) holding row, col, hp,
+    max_hp, atk, gold, game state, monster id (-1 if none), monster hp,
+    then the count of every item.
+    """
+    MOVES = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)], dtype=np.int64)
+    ATTACK, USE_ITEM, LEAVE, BUY = 4, 5, 6, 7
+
+    def __init__(self, num_envs, seed=None, max_steps=1000, buffers=None):
+        content = Snake.CONTENT
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+        tile_codes = {'.': Snake.STATE_MAP, 'T': Snake.STATE_TOWN, 'D': Snake.STATE_DUNGEON}
+        self.tiles = np.array([[tile_codes[t] for t in row] for row in Snake.GAME_MAP],
+                              dtype=np.int64)
+        self.height, self.width = self.tiles.shape
+
+        self.item_price = np.array(content.item_price, dtype=np.int64)
+        self.item_heal = np.array(content.item_heal, dtype=np.int64)
+        self.heal_order = list(content.heal_order)
+        self.shop = np.array(Snake.SHOP_ITEMS, dtype=np.int64)
+        self.monster_hp_table = np.array(content.monster_hp, dtype=np.int64)
+        self.monster_atk_table = np.array(content.monster_atk, dtype=np.int64)
+        self.monster_gold_table = np.array(content.monster_gold, dtype=np.int64)
+        encounter = content.encounters["dungeon"]
+        self.enc_ids = np.array(encounter.ids, dtype=np.int64)
+        self.enc_prob = np.array(encounter.prob)
+        self.enc_alias = np.array(encounter.alias, dtype=np.int64)
+        self.num_actions = self.BUY + len(self.shop)
+
+        hero = Snake.Player(inventory=content.starting_items)
+        self.start_hp, self.start_atk, self.start_gold = hero.hp, hero.atk, hero.gold
+        self.start_inventory = np.zeros(len(content.item_names), dtype=np.int64)
+        for item_id, count in hero.inventory.items():
+            self.start_inventory[item_id] = count
+
+        n = num_envs
+        self.row = np.zeros(n, dtype=np.int64)
+        self.col = np.zeros(n, dtype=np.int64)
+        self.hp = np.zeros(n, dtype=np.int64)
+        self.atk = np.zeros(n, dtype=np.int64)
+        self.gold = np.zeros(n, dtype=np.int64)
+        self.inventory = np.zeros((n, len(self.start_inventory)), dtype=np.int64)
+        self.state = np.zeros(n, dtype=np.int64)
+        self.monster = np.full(n, -1, dtype=np.int64)
+        self.monster_hp = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        self.obs_shape = (9 + len(self.start_inventory),)
+        self.obs_dtype = np.int32
+        self.buffers = buffers or _make_buffers(num_envs, self.obs_shape, self.obs_dtype)
+
+    def _reset_envs(self, idx):
+        self.row[idx] = 0
+        self.col[idx] = 0
+        self.hp[idx] = self.start_hp
+        self.atk[idx] = self.start_atk
+        self.gold[idx] = self.start_gold
+        self.inventory[idx] = self.start_inventory
+        self.state[idx] = Snake.STATE_MAP
+        self.monster[idx] = -1
+        self.monster_hp[idx] = 0
+        self.steps[idx] = 0
+
+    def _write_obs(self):
+        obs = self.buffers["obs"]
+        obs[:, 0] = self.row
+        obs[:, 1] = self.col
+        obs[:, 2] = self.hp
+        obs[:, 3] = self.start_hp
+        obs[:, 4] = self.atk
+        obs[:, 5] = self.gold
+        obs[:, 6] = self.state
+        obs[:, 7] = self.monster
+        obs[:, 8] = self.monster_hp
+        obs[:, 9:] = self.inventory
+        return obs
+
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        self.buffers["reward"][:] = 0
+        self.buffers["done"][:] = False
+        return self._write_obs()
+
+    def _map_step(self, idx, actions):
+        """
+        move_player() followed by check_tile_event().
+        """
+        move = self.MOVES[actions]
+        nr = self.row[idx] + move[:, 0]
+        nc = self.col[idx] + move[:, 1]
+        inside = (nr >= 0) & (nr < self.height) & (nc >= 0) & (nc < self.width)
+        self.row[idx] = np.where(inside, nr, self.row[idx])
+        self.col[idx] = np.where(inside, nc, self.col[idx])
+        self.state[idx] = self.tiles[self.row[idx], self.col[idx]]
+
+    def _town_step(self, idx, actions):
+        """
+        buy_item() for keys 1..n, leave town on ESC.
+        """
+        self.state[idx[actions == self.LEAVE]] = Snake.STATE_MAP
+        slot = actions - self.BUY
+        buying = (slot >= 0) & (slot < len(self.shop))
+        idx, slot = idx[buying], slot[buying]
+        item = self.shop[slot]
+        price = self.item_price[item]
+        can_pay = self.gold[idx] >= price
+        idx, item, price = idx[can_pay], item[can_pay], price[can_pay]
+        self.gold[idx] -= price
+        np.add.at(self.inventory, (idx, item), 1)
+
+    def _dungeon_step(self, idx):
+        """
+        enter_dungeon(): 80% chance of an encounter.
+        """
+        meet = self.rng.random(len(idx)) < 0.8
+        self.state[idx[~meet]] = Snake.STATE_MAP
+        idx = idx[meet]
+        # Alias-method sample from the dungeon encounter table
+        pick = self.rng.integers(len(self.enc_ids), size=len(idx))
+        use_alias = self.rng.random(len(idx)) >= self.enc_prob[pick]
+        monster = self.enc_ids[np.where(use_alias, self.enc_alias[pick], pick)]
+        self.monster[idx] = monster
+        self.monster_hp[idx] = self.monster_hp_table[monster]
+        self.state[idx] = Snake.STATE_BATTLE
+
+    def _battle_step(self, idx, actions, reward):
+        """
+        battle() for attack / use item / run away.
+        """
+        self.state[idx[actions == self.LEAVE]] = Snake.STATE_MAP
+
+        attack = idx[actions == self.ATTACK]
+        self.monster_hp[attack] -= self.atk[attack]
+        hit_back = attack[self.monster_hp[attack] > 0]
+        self.hp[hit_back] -= self.monster_atk_table[self.monster[hit_back]]
+
+        # use_item_in_battle(): strongest healing item first
+        heal = idx[actions == self.USE_ITEM]
+        for item in self.heal_order:
+            has = self.inventory[heal, item] > 0
+            user = heal[has]
+            self.hp[user] = np.minimum(self.hp[user] + self.item_heal[item], self.start_hp)
+            self.inventory[user, item] -= 1
+            heal = heal[~has]
+
+        acted = idx[(actions == self.ATTACK) | (actions == self.USE_ITEM)]
+        won = acted[self.monster_hp[acted] <= 0]
+        drop = self.monster_gold_table[self.monster[won]]
+        self.gold[won] += drop
+        reward[won] += drop
+        lost = acted[(self.monster_hp[acted] > 0) & (self.hp[acted] <= 0)]
+        ended = np.concatenate([won, lost])
+        self.state[ended] = Snake.STATE_MAP
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        reward = self.buffers["reward"]
+        done = self.buffers["done"]
+        reward[:] = 0
+
+        state = self.state.copy()
+        for code in (Snake.STATE_MAP, Snake.STATE_TOWN, Snake.STATE_DUNGEON, Snake.STATE_BATTLE):
+            idx = np.flatnonzero(state == code)
+            if not len(idx):
+                continue
+            act = actions[idx]
+            if code == Snake.STATE_MAP:
+                moving = act < len(self.MOVES)
+                self._map_step(idx[moving], act[moving])
+            elif code == Snake.STATE_TOWN:
+                self._town_step(idx, act)
+            elif code == Snake.STATE_DUNGEON:
+                self._dungeon_step(idx)
+            else:
+                self._battle_step(idx, act, reward)
+        self.monster[self.state != Snake.STATE_BATTLE] = -1
+
+        self.steps += 1
+        done[:] = self.hp <= 0
+        if self.max_steps is not None:
+            done |= self.steps >= self.max_steps
+
+        info = {}
+        finished = np.flatnonzero(done)
+        if len(finished):
+            info["final_gold"] = dict(zip(finished.tolist(), self.gold[finished].tolist()))
+            self._reset_envs(finished)
+        return self._write_obs(), reward, done, info
+
+
+# =======================
+#   Subprocess Workers
+# =======================
+
+def _worker(conn, env_cls, num_envs, env_kwargs, shm_names, shapes, dtypes, start):
+    blocks = {key: shared_memory.SharedMemory(name=shm_names[key]) for key in shm_names}
+    arrays = {key: np.ndarray(shapes[key], dtype=dtypes[key], buffer=blocks[key].buf)
+              for key in blocks}
+    end = start + num_envs
+    buffers = {key: arrays[key][start:end] for key in ("obs", "reward", "done")}
+    env = env_cls(num_envs, buffers=buffers, **env_kwargs)
+    actions = arrays["actions"][start:end]
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == "step":
+                _, _, _, info = env.step(actions)
+                # Report finished games with global env indices
+                conn.send({key: {start + i: v for i, v in values.items()}
+                           for key, values in info.items()})
+            elif cmd == "reset":
+                env.reset()
+                conn.send(None)
+            elif cmd == "close":
+                break
+    finally:
+        del env, buffers, actions, arrays
+        for block in blocks.values():
+            block.close()
+        conn.close()
+
+
+class SubprocVecEnv:
+    """
+    Run an environment class across `num_workers` processes.
+
+    Actions, observations, rewards and done flags live in shared memory;
+    the pipes only carry one short command per step, so nothing large is
+    ever pickled. Each worker steps its own slice of the games.
+    """
+
+    def __init__(self, env_cls, num_envs, num_workers, seed=None, **env_kwargs):
+        self.num_envs = num_envs
+        probe = env_cls(1, **env_kwargs)
+        self.num_actions = probe.num_actions
+        shapes = {
+            "obs": (num_envs,) + probe.obs_shape,
+            "reward": (num_envs,),
+            "done": (num_envs,),
+            "actions": (num_envs,),
+        }
+        dtypes = {"obs": probe.obs_dtype, "reward": np.float32,
+                  "done": np.bool_, "actions": np.int64}
+        self.blocks = {}
+        self.arrays = {}
+        for key, shape in shapes.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtypes[key]).itemsize)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtypes[key], buffer=block.buf)
+        shm_names = {key: block.name for key, block in self.blocks.items()}
+
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self.conns = []
+        self.procs = []
+        for w in range(num_workers):
+            parent, child = mp.Pipe()
+            kwargs = dict(env_kwargs, seed=seeds[w])
+            proc = mp.Process(target=_worker, daemon=True,
+                              args=(child, env_cls, bounds[w + 1] - bounds[w], kwargs,
+                                    shm_names, shapes, dtypes, bounds[w]))
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def reset(self):
+        for conn in self.conns:
+            conn.send("reset")
+        for conn in self.conns:
+            conn.recv()
+        return self.arrays["obs"]
+
+    def step(self, actions):
+        self.arrays["actions"][:] = actions
+        for conn in self.conns:
+            conn.send("step")
+        info = {}
+        for conn in self.conns:
+            for key, values in conn.recv().items():
+                info.setdefault(key, {}).update(values)
+        return self.arrays["obs"], self.arrays["reward"], self.arrays["done"], info
+
+    def close(self):
+        for conn in self.conns:
+            conn.send("close")
+        for proc in self.procs:
+            proc.join()
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
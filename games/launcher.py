@@ -0,0 +1,79 @@
+import importlib
+import sys
+import time
+
+import startup
+
+# (menu name, module, entry function, toolkit). Modules are only imported
+# once picked, so choosing Monopoly never loads pygame and the pygame games
+# never load tkinter.
+GAMES = [
+    ("Tetris", "Tetris", "main", "pygame"),
+    ("Tetris Versus", "Tetris", "versus_main", "pygame"),
+    ("RPG", "Snake", "main", "pygame"),
+    ("Monopoly", "Monopoly", "main", "tkinter"),
+    ("Monopoly vs Computer", "Monopoly", "main_vs_computer", "tkinter"),
+]
+
+
+def close_pygame_window():
+    """
+    Close a pygame window left open by a previous game, if any.
+    """
+    pygame = sys.modules.get("pygame")
+    if pygame is not None and pygame.display.get_init():
+        pygame.display.quit()
+
+
+def launch(index):
+    """
+    Import (if needed) and run one game, reporting how long it took from
+    the menu choice until the game was ready to play as soon as it is.
+    """
+    name, module_name, entry, toolkit = GAMES[index]
+    start = time.perf_counter()
+
+    cold = module_name not in sys.modules
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+
+    def report():
+        parts = [f"import {(imported - start) * 1000:.1f} ms ({'cold' if cold else 'warm'})"]
+        if toolkit == "pygame":
+            parts.append("display reused" if startup.display_reused else "display initialized")
+            parts.append("window resized" if startup.window_resized else "same window size")
+        print(f"{name} ready in {(startup.ready_time - start) * 1000:.1f} ms: " + ", ".join(parts))
+
+    if toolkit == "tkinter":
+        close_pygame_window()
+    startup.on_ready = report
+    try:
+        getattr(module, entry)()
+    finally:
+        startup.on_ready = None
+
+
+def main():
+    # Games can also be started directly: python launcher.py tetris
+    args = [arg.lower() for arg in sys.argv[1:]]
+    for arg in args:
+        for i, (name, module_name, entry, _) in enumerate(GAMES):
+            if arg in (name.lower(), str(i + 1)) or (arg == module_name.lower() and entry == "main"):
+                launch(i)
+
+    while True:
+        print()
+        for i, (name, _, _, _) in enumerate(GAMES):
+            print(f"{i + 1}. {name}")
+        try:
+            choice = input("Choose a game (q to quit): ").strip().lower()
+        except EOFError:
+            break
+        if choice == "q":
+            break
+        if choice.isdigit() and 1 <= int(choice) <= len(GAMES):
+            launch(int(choice) - 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import random
+from array import array
+
+# 兩顆六面骰各點數和的機率：{點數和: 機率}
+DICE_PROBS = {}
+for _a in range(1, 7):
+    for _b in range(1, 7):
+        DICE_PROBS[_a + _b] = DICE_PROBS.get(_a + _b, 0) + 1 / 36
+
+# 預設往後看幾回合，以及可接受的破產機率
+HORIZON = 3
+RISK_LIMIT = 0.1
+
+
+class AssetTracker:
+    """
+    電腦玩家決策用的快取，隨遊戲事件增量更新：
+
+    - 每位玩家的地產總值（淨資產 = 現金 + 地產總值）
+    - 過路費風險：從某格出發，未來 horizon 回合內要付的過路費總額分佈
+
+    過路費分佈只有在地產易主時才需要重算（且只重算過路費有變的玩家），
+    之後「淨資產」「預期過路費」「破產機率」與「要不要買」都是 O(1) 查表。
+    """
+
+    def __init__(self, board, players, horizon=HORIZON):
+        self.board = board
+        self.players = players
+        self.horizon = horizon
+        self.owned_value = {p: 0 for p in players}
+        for tile in board:
+            if tile.owner is not None:
+                self.owned_value[tile.owner] += tile.price
+        # {player: {position: (cdf, 預期過路費)}}
+        self._tables = {p: {} for p in players}
+
+    # ---------- 事件 ----------
+
+    def set_owner(self, tile, player):
+        """地產易主（購買或釋出）時呼叫，取代直接設定 tile.owner。"""
+        old = tile.owner
+        if old is player:
+            return
+        if old is not None:
+            self.owned_value[old] -= tile.price
+        if player is not None:
+            self.owned_value[player] += tile.price
+        tile.owner = player
+        # 只清掉這一格過路費有變的玩家：
+        # 從一位地主直接換到另一位時，只有新舊地主受影響；
+        # 無主 <-> 有主時，則是地主以外的所有人
+        if old is not None and player is not None:
+            changed = (old, player)
+        else:
+            owner = old if old is not None else player
+            changed = [p for p in self.players if p is not owner]
+        for p in changed:
+            self._tables[p].clear()
+
+    def release_all(self, player):
+        """玩家破產：釋出他所有的地產。"""
+        for tile in self.board:
+            if tile.owner is player:
+                self.set_owner(tile, None)
+
+    # ---------- 查詢 ----------
+
+    def net_worth(self, player):
+        return player.money + self.owned_value[player]
+
+    def toll_exposure(self, player, position=None):
+        """從 position 出發，未來 horizon 回合預期要付的過路費。"""
+        return self._table(player, position)[1]
+
+    def danger(self, player, money=None, position=None):
+        """
+        從 position 出發、手上有 money 時，
+        未來 horizon 回合內付不出過路費（破產）的機率。
+        """
+        if money is None:
+            money = player.money
+        if money < 0:
+            return 1.0
+        cdf = self._table(player, position)[0]
+        if money >= len(cdf):
+            return 0.0
+        return 1.0 - cdf[money]
+
+    def should_buy(self, player, tile, risk_limit=RISK_LIMIT):
+        """買下 tile 之後，破產機率仍在 risk_limit 以內才買。"""
+        money_after = player.money - tile.price
+        return money_after >= 0 and self.danger(player, money_after) <= risk_limit
+
+    # ---------- 內部 ----------
+
+    def _table(self, player, position):
+        if position is None:
+            position = player.position
+        tables = self._tables[player]
+        table = tables.get(position)
+        if table is None:
+            table = tables[position] = self._build(player, position)
+        return table
+
+    def _build(self, player, start):
+        """
+        以擲骰分佈做動態規劃，算出 horizon 回合內過路費總額的分佈，
+        並轉成累積分佈 cdf[錢] = P(總額 <= 錢)。
+        （只計算要付出的過路費，不計收到的錢。）
+        """
+        size = len(self.board)
+        tolls = [tile.toll if tile.owner is not None and tile.owner is not player else 0
+                 for tile in self.board]
+        states = {(start, 0): 1.0}
+        for _ in range(self.horizon):
+            nxt = {}
+            for (pos, total), prob in states.items():
+                for steps, p in DICE_PROBS.items():
+                    new_pos = (pos + steps) % size
+                    key = (new_pos, total + tolls[new_pos])
+                    nxt[key] = nxt.get(key, 0.0) + prob * p
+            states = nxt
+
+        totals = {}
+        for (_, total), prob in states.items():
+            totals[total] = totals.get(total, 0.0) + prob
+        max_total = max(totals)
+        cdf = array('d', [0.0]) * (max_total + 1)
+        for total, prob in totals.items():
+            cdf[total] += prob
+        running = 0.0
+        for i in range(len(cdf)):
+            running += cdf[i]
+            cdf[i] = running
+        expected = sum(total * prob for total, prob in totals.items())
+        return cdf, expected
+
+
+def simulate_game(num_players=2, max_rounds=500, rng=random, risk_limit=RISK_LIMIT):
+    """
+    不開視窗，讓電腦玩家對打一局，規則與 MonopolyGUI 相同。
+    回傳 (贏家索引或 None, 進行的回合數)。
+    """
+    from Monopoly import Player, create_board
+
+    board = create_board()
+    players = [Player(f"電腦{i + 1}") for i in range(num_players)]
+    tracker = AssetTracker(board, players)
+
+    def buy_callback(tile, player):
+        if tracker.should_buy(player, tile, risk_limit):
+            player.pay(tile.price)
+            tracker.set_owner(tile, player)
+
+    for round_number in range(1, max_rounds + 1):
+        for player in players:
+            if not player.alive:
+                continue
+            player.move(rng.randint(1, 6) + rng.randint(1, 6), len(board))
+            board[player.position].landed_on(player, buy_callback)
+            if not player.alive:
+                tracker.release_all(player)
+            alive = [p for p in players if p.alive]
+            if len(alive) == 1:
+                return players.index(alive[0]), round_number
+    return None, max_rounds
+
+
+def simulate(num_games, num_players=2, seed=None, **kwargs):
+    """
+    連續模擬 num_games 局，回傳 {贏家索引（平手為 None）: 勝場數}。
+    """
+    rng = random.Random(seed)
+    wins = {}
+    for _ in range(num_games):
+        winner, _ = simulate_game(num_players, rng=rng, **kwargs)
+        wins[winner] = wins.get(winner, 0) + 1
+    return wins
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    start = time.perf_counter()
+    result = simulate(games, seed=0)
+    elapsed = time.perf_counter() - start
+    print(f"{games} 局，{elapsed:.2f} 秒：{result}")
@@ -0,0 +1,228 @@
+import atexit
+import csv
+import functools
+import json
+import os
+import time
+from array import array
+
+# Profiling is opt-in: MINIGAME_PROFILE=1 python games/Tetris.py
+# When it is off, get_profiler() hands out a no-op object and counted()
+# returns the function unchanged, so the hooks cost (almost) nothing.
+ENABLED = os.environ.get("MINIGAME_PROFILE", "") not in ("", "0")
+# Directory the profile-<game>.json / .csv reports are written to at exit
+OUTPUT_DIR = os.environ.get("MINIGAME_PROFILE_DIR", ".")
+
+# Histogram resolution: 0.1 ms buckets up to 250 ms, then one overflow bucket
+BUCKET_MS = 0.1
+BUCKET_COUNT = 2500
+
+# {module name: {function qualname: [calls, total seconds]}}; each game's
+# profiler only reports the counters of its own module
+COUNTERS = {}
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram: recording is O(1) and memory use does
+    not grow with the length of the session.
+    """
+
+    def __init__(self):
+        self.buckets = array('l', [0]) * (BUCKET_COUNT + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        i = int(ms / BUCKET_MS)
+        self.buckets[i if i < BUCKET_COUNT else BUCKET_COUNT] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p):
+        """
+        Upper edge (ms) of the bucket holding the p-th percentile.
+        """
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return self.max if i == BUCKET_COUNT else min((i + 1) * BUCKET_MS, self.max)
+        return self.max
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+        }
+
+
+class FrameProfiler:
+    """
+    Per-frame phase timer. A game loop calls begin_frame() at the top,
+    mark("input") / mark("update") / mark("render") after each phase, and
+    end_frame() at the bottom; each mark() charges the time since the
+    previous mark to that phase. A phase marked several times in one frame
+    is recorded once, with the times added up.
+    """
+
+    def __init__(self, name, module=None):
+        self.name = name
+        self.module = module
+        self.phases = {}
+        self.frame = Histogram()
+        self.overlay = False
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._pending = {}
+
+    def begin_frame(self):
+        self._frame_start = self._last = time.perf_counter()
+        self._pending.clear()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self._pending[phase] = self._pending.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def end_frame(self):
+        self.frame.record((time.perf_counter() - self._frame_start) * 1000.0)
+        for phase, seconds in self._pending.items():
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = Histogram()
+            hist.record(seconds * 1000.0)
+        self._pending.clear()
+
+    def counters(self):
+        return COUNTERS.get(self.module, {})
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+
+    def summary_lines(self):
+        """
+        Short text report, one line per phase plus the busiest counters.
+        """
+        lines = []
+        for name, hist in [("frame", self.frame)] + sorted(self.phases.items()):
+            s = hist.stats()
+            lines.append(f"{name}: p50 {s['p50_ms']:.1f} p95 {s['p95_ms']:.1f} "
+                         f"p99 {s['p99_ms']:.1f} ms")
+        busiest = sorted(self.counters().items(), key=lambda kv: -kv[1][1])[:3]
+        for name, (calls, total) in busiest:
+            lines.append(f"{name}: {calls} calls, {total * 1000.0:.0f} ms")
+        return lines
+
+    def draw_overlay(self, surface, font, color=(255, 255, 0)):
+        """
+        Blit the summary in the top-right corner of a pygame surface.
+        """
+        if not self.overlay:
+            return
+        y = 4
+        for line in self.summary_lines():
+            text = font.render(line, True, color)
+            surface.blit(text, (surface.get_width() - text.get_width() - 4, y))
+            y += text.get_height()
+
+    def report(self):
+        return {
+            "game": self.name,
+            "frame": self.frame.stats(),
+            "phases": {name: hist.stats() for name, hist in self.phases.items()},
+            "counters": {name: {"calls": calls, "total_ms": total * 1000.0}
+                         for name, (calls, total) in self.counters().items()},
+        }
+
+    def export(self, base=None):
+        """
+        Write the report to <base>.json and <base>.csv.
+        """
+        base = base or os.path.join(OUTPUT_DIR, f"profile-{self.name}")
+        report = self.report()
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        with open(base + ".csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kind", "name", "count", "mean_ms", "p50_ms",
+                             "p95_ms", "p99_ms", "max_ms", "total_ms"])
+            timings = [("frame", report["frame"])] + list(report["phases"].items())
+            for name, s in timings:
+                writer.writerow(["phase", name, s["count"], s["mean_ms"], s["p50_ms"],
+                                 s["p95_ms"], s["p99_ms"], s["max_ms"], ""])
+            for name, c in report["counters"].items():
+                writer.writerow(["counter", name, c["calls"], "", "", "", "", "",
+                                 c["total_ms"]])
+
+
+class NullProfiler:
+    """
+    Stand-in used when profiling is disabled: every hook does nothing.
+    """
+    overlay = False
+
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def toggle_overlay(self):
+        pass
+
+    def summary_lines(self):
+        return []
+
+    def draw_overlay(self, surface, font, color=None):
+        pass
+
+    def export(self, base=None):
+        pass
+
+
+def get_profiler(name, module=None):
+    """
+    Return the profiler for a game. `module` is the __name__ of the game's
+    module, whose @counted functions the report includes. When enabled,
+    the report is exported automatically at interpreter exit.
+    """
+    if not ENABLED:
+        return NullProfiler()
+    profiler = FrameProfiler(name, module)
+    atexit.register(profiler.export)
+    return profiler
+
+
+def counted(fn):
+    """
+    Decorator counting calls and total time of a hot function.
+    A no-op (returns fn itself) when profiling is disabled.
+    """
+    if not ENABLED:
+        return fn
+    counter = COUNTERS.setdefault(fn.__module__, {}).setdefault(fn.__qualname__, [0, 0.0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += perf_counter() - start
+    return wrapper
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import pickle
+import random
+from array import array
+
+# =======================
+#     Content Files
+# =======================
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CONTENT_FILES = ("items.json", "monsters.json", "shops.json")
+CACHE_FILE = ".content_cache.pickle"
+
+# Bump whenever the compiled layout below changes
+CACHE_VERSION = 3
+
+
+class EncounterTable:
+    """
+    Weighted table compiled with Vose's alias method: sampling costs one
+    random index and one comparison, however many entries it has.
+    """
+    __slots__ = ("ids", "prob", "alias")
+
+    def __init__(self, ids, weights):
+        n = len(ids)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.ids = array('i', ids)
+        self.prob = array('d', prob)
+        self.alias = array('i', alias)
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.ids))
+        if rng.random() >= self.prob[i]:
+            i = self.alias[i]
+        return self.ids[i]
+
+
+class ContentTables:
+    """
+    All RPG content compiled into integer-indexed parallel arrays.
+
+    Items and monsters are referred to by id everywhere in the game;
+    names are only needed for display and when reading the data files.
+    """
+
+    def __init__(self):
+        self.item_names = []
+        self.item_ids = {}
+        self.item_price = array('i')
+        self.item_heal = array('i')
+        self.starting_items = {}     # {item_id: count}
+        self.heal_order = []         # Healing items, strongest first
+
+        self.monster_names = []
+        self.monster_ids = {}
+        self.monster_hp = array('i')
+        self.monster_atk = array('i')
+        self.monster_gold = array('i')
+
+        self.shops = {}              # {shop name: [item_id, ...]}
+        self.encounters = {}         # {table name: EncounterTable}
+
+    def sample_encounter(self, table, rng=random):
+        return self.encounters[table].sample(rng)
+
+
+def _read_json(data_dir, filename):
+    path = os.path.join(data_dir, filename)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _lookup(ids, name, kind, filename):
+    try:
+        return ids[name]
+    except KeyError:
+        raise ValueError(f"{filename}: unknown {kind} '{name}'") from None
+
+
+def compile_content(data_dir=DATA_DIR):
+    """
+    Parse the JSON content files and build the lookup tables.
+    """
+    tables = ContentTables()
+
+    for entry in _read_json(data_dir, "items.json")["items"]:
+        item_id = len(tables.item_names)
+        tables.item_names.append(entry["name"])
+        tables.item_ids[entry["name"]] = item_id
+        tables.item_price.append(entry.get("price", 0))
+        tables.item_heal.append(entry.get("heal", 0))
+        if entry.get("starting"):
+            tables.starting_items[item_id] = entry["starting"]
+    tables.heal_order = sorted((i for i, heal in enumerate(tables.item_heal) if heal > 0),
+                               key=lambda i: -tables.item_heal[i])
+
+    monster_data = _read_json(data_dir, "monsters.json")
+    for entry in monster_data["monsters"]:
+        tables.monster_ids[entry["name"]] = len(tables.monster_names)
+        tables.monster_names.append(entry["name"])
+        tables.monster_hp.append(entry["hp"])
+        tables.monster_atk.append(entry["atk"])
+        tables.monster_gold.append(entry["gold"])
+    for table, weights in monster_data["encounters"].items():
+        if not weights:
+            raise ValueError(f"monsters.json: encounter table '{table}' is empty")
+        for name, weight in weights.items():
+            if not isinstance(weight, (int, float)) or weight < 0:
+                raise ValueError(f"monsters.json: encounter table '{table}' has an invalid "
+                                 f"weight {weight!r} for '{name}'")
+        if sum(weights.values()) <= 0:
+            raise ValueError(f"monsters.json: encounter table '{table}' has no positive weight")
+        ids = [_lookup(tables.monster_ids, name, "monster", "monsters.json") for name in weights]
+        tables.encounters[table] = EncounterTable(ids, list(weights.values()))
+
+    for shop, names in _read_json(data_dir, "shops.json")["shops"].items():
+        tables.shops[shop] = [_lookup(tables.item_ids, name, "item", "shops.json")
+                              for name in names]
+    return tables
+
+
+def _source_stamp(data_dir):
+    """
+    Identify the current content files by size and modification time.
+    """
+    stamp = [CACHE_VERSION]
+    for filename in CONTENT_FILES:
+        st = os.stat(os.path.join(data_dir, filename))
+        stamp.append([filename, st.st_size, st.st_mtime_ns])
+    return stamp
+
+
+def load_content(data_dir=DATA_DIR):
+    """
+    Return the compiled content tables, reusing the on-disk cache when the
+    data files have not changed since it was written.
+
+    The cache file is one JSON header line (source stamp and SHA-256 of
+    the payload) followed by the pickled tables, so a stale or damaged
+    cache is rejected before anything is unpickled.
+    """
+    cache_path = os.path.join(data_dir, CACHE_FILE)
+    stamp = _source_stamp(data_dir)
+    try:
+        with open(cache_path, "rb") as f:
+            header = json.loads(f.readline())
+            payload = f.read()
+        if (header["stamp"] == stamp
+                and hashlib.sha256(payload).hexdigest() == header["sha256"]):
+            return pickle.loads(payload)
+    except Exception:
+        pass  # Missing, stale or corrupt cache: it is only a cache, rebuild below
+
+    tables = compile_content(data_dir)
+    # Write to a temporary file first so an interrupted write never leaves
+    # a torn cache behind (the pid keeps concurrent launches apart)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        payload = pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL)
+        header = {"stamp": stamp, "sha256": hashlib.sha256(payload).hexdigest()}
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Read-only install: just compile on every launch
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return tables
@@ -0,0 +1,218 @@
+import random
+from array import array
+
+# =======================
+#     Entity Kinds
+# =======================
+KIND_MONSTER = 0
+KIND_NPC = 1
+
+# Size of one spatial hash bucket, in tiles
+CELL_SIZE = 8
+
+
+class SpatialHash:
+    """
+    Bucket entity ids by the (CELL_SIZE x CELL_SIZE) cell they stand in,
+    so "what is on / near this tile" only looks at a handful of buckets
+    instead of every entity on the map.
+    """
+    __slots__ = ("cell_size", "buckets")
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.buckets = {}
+
+    def _key(self, row, col):
+        return (row // self.cell_size, col // self.cell_size)
+
+    def insert(self, eid, row, col):
+        key = self._key(row, col)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = set()
+        bucket.add(eid)
+
+    def remove(self, eid, row, col):
+        key = self._key(row, col)
+        bucket = self.buckets[key]
+        bucket.discard(eid)
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, eid, old_row, old_col, new_row, new_col):
+        old_key = self._key(old_row, old_col)
+        new_key = self._key(new_row, new_col)
+        if old_key != new_key:
+            self.remove(eid, old_row, old_col)
+            self.insert(eid, new_row, new_col)
+
+    def candidates(self, top, left, bottom, right):
+        """
+        Yield every entity id whose cell overlaps the tile rectangle
+        [top, bottom] x [left, right] (inclusive). Callers still have to
+        check the exact position.
+        """
+        size = self.cell_size
+        for cr in range(top // size, bottom // size + 1):
+            for cc in range(left // size, right // size + 1):
+                bucket = self.buckets.get((cr, cc))
+                if bucket:
+                    yield from bucket
+
+
+class EntityStore:
+    """
+    Compact storage for roaming monsters and NPCs.
+
+    Every field lives in its own typed array indexed by entity id, so a
+    world with thousands of entities costs a few bytes per entity instead
+    of one Python object each. Ids of despawned entities are recycled.
+    """
+
+    def __init__(self, map_height, map_width, cell_size=CELL_SIZE):
+        self.map_height = map_height
+        self.map_width = map_width
+        self.row = array('i')
+        self.col = array('i')
+        self.kind = array('b')
+        self.template = array('i')   # Index into the monster / NPC table
+        self.hp = array('i')
+        self.alive = array('b')
+        self.free_ids = []
+        self.count = 0
+        self.grid = SpatialHash(cell_size)
+
+    def __len__(self):
+        return self.count
+
+    FIELDS = ("row", "col", "kind", "template", "hp", "alive")
+
+    def dump(self):
+        """
+        Return a compact, picklable copy of the store (raw array bytes).
+        """
+        return {
+            "fields": {name: getattr(self, name).tobytes() for name in self.FIELDS},
+            "free_ids": list(self.free_ids),
+        }
+
+    def load(self, state):
+        """
+        Replace the contents of the store with a dump() result and
+        rebuild the spatial hash.
+        """
+        for name in self.FIELDS:
+            field = getattr(self, name)
+            del field[:]
+            field.frombytes(state["fields"][name])
+        self.free_ids = list(state["free_ids"])
+        self.grid = SpatialHash(self.grid.cell_size)
+        self.count = 0
+        for eid, alive in enumerate(self.alive):
+            if alive:
+                self.grid.insert(eid, self.row[eid], self.col[eid])
+                self.count += 1
+
+    def spawn(self, kind, row, col, template, hp=0):
+        """
+        Add an entity at (row, col) and return its id.
+        """
+        if self.free_ids:
+            eid = self.free_ids.pop()
+            self.row[eid] = row
+            self.col[eid] = col
+            self.kind[eid] = kind
+            self.template[eid] = template
+            self.hp[eid] = hp
+            self.alive[eid] = 1
+        else:
+            eid = len(self.row)
+            self.row.append(row)
+            self.col.append(col)
+            self.kind.append(kind)
+            self.template.append(template)
+            self.hp.append(hp)
+            self.alive.append(1)
+        self.grid.insert(eid, row, col)
+        self.count += 1
+        return eid
+
+    def despawn(self, eid):
+        """
+        Remove an entity; its id may be handed out again by spawn().
+        """
+        if not self.alive[eid]:
+            return
+        self.grid.remove(eid, self.row[eid], self.col[eid])
+        self.alive[eid] = 0
+        self.free_ids.append(eid)
+        self.count -= 1
+
+    def move(self, eid, row, col):
+        self.grid.move(eid, self.row[eid], self.col[eid], row, col)
+        self.row[eid] = row
+        self.col[eid] = col
+
+    def at(self, row, col, kind=None):
+        """
+        Return the ids of living entities standing exactly on (row, col).
+        """
+        return list(self.near(row, col, 0, kind))
+
+    def near(self, row, col, radius, kind=None):
+        """
+        Yield the ids of living entities within `radius` tiles
+        (Chebyshev distance) of (row, col).
+        """
+        e_row, e_col, e_kind = self.row, self.col, self.kind
+        for eid in self.grid.candidates(row - radius, col - radius,
+                                        row + radius, col + radius):
+            if abs(e_row[eid] - row) > radius or abs(e_col[eid] - col) > radius:
+                continue
+            if kind is not None and e_kind[eid] != kind:
+                continue
+            yield eid
+
+    def update(self, center_row, center_col, radius, can_enter, rng=random, move_chance=0.5,
+               step_toward=None, chase_radius=0, target=None):
+        """
+        One AI tick. Only monsters within `radius` tiles of the camera
+        centre are touched; everything further away is left frozen.
+
+        Monsters within `chase_radius` of the centre move to the tile
+        returned by step_toward(row, col), if any. The others take a random
+        step with probability `move_chance`. Either way they only enter a
+        tile where can_enter(row, col) is True and no other entity stands.
+        NPCs stay where they are.
+
+        A chasing monster whose step lands on `target` (row, col), e.g. the
+        player, stays put and is reported instead. Returns the list of
+        those entity ids, in the order they reached the target.
+        """
+        reached = []
+        # Snapshot first: moving entities mutates the hash buckets
+        active = list(self.near(center_row, center_col, radius, KIND_MONSTER))
+        for eid in active:
+            row, col = self.row[eid], self.col[eid]
+            if (step_toward is not None and abs(row - center_row) <= chase_radius
+                    and abs(col - center_col) <= chase_radius):
+                step = step_toward(row, col)
+                if step is None:
+                    continue
+                new_r, new_c = step
+                if target is not None and new_r == target[0] and new_c == target[1]:
+                    reached.append(eid)
+                    continue
+            else:
+                if rng.random() >= move_chance:
+                    continue
+                drow, dcol = rng.choice(((-1, 0), (1, 0), (0, -1), (0, 1)))
+                new_r = row + drow
+                new_c = col + dcol
+            if not (0 <= new_r < self.map_height and 0 <= new_c < self.map_width):
+                continue
+            if not can_enter(new_r, new_c) or self.at(new_r, new_c):
+                continue
+            self.move(eid, new_r, new_c)
+        return reached
@@ -0,0 +1,198 @@
+import heapq
+from array import array
+from collections import deque
+
+# Distance value for tiles that cannot reach any source
+UNREACHABLE = -1
+
+NEIGHBORS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def find_path(start, goal, height, width, walkable):
+    """
+    A* search on a 4-connected grid.
+
+    walkable(r, c) decides which tiles may be crossed; the goal itself is
+    always allowed. Returns the list of (row, col) steps after `start` up
+    to and including `goal`, or None when the goal cannot be reached.
+    """
+    start = tuple(start)
+    goal = tuple(goal)
+    if start == goal:
+        return []
+    gr, gc = goal
+
+    came_from = {start: None}
+    cost = {start: 0}
+    frontier = [(abs(start[0] - gr) + abs(start[1] - gc), 0, start)]
+    while frontier:
+        _, g, node = heapq.heappop(frontier)
+        if node == goal:
+            path = []
+            while node != start:
+                path.append(node)
+                node = came_from[node]
+            path.reverse()
+            return path
+        if g > cost[node]:
+            continue  # Stale heap entry
+        r, c = node
+        for dr, dc in NEIGHBORS:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < height and 0 <= nc < width):
+                continue
+            nxt = (nr, nc)
+            if nxt != goal and not walkable(nr, nc):
+                continue
+            new_cost = g + 1
+            if new_cost < cost.get(nxt, new_cost + 1):
+                cost[nxt] = new_cost
+                came_from[nxt] = node
+                heapq.heappush(frontier,
+                               (new_cost + abs(nr - gr) + abs(nc - gc), new_cost, nxt))
+    return None
+
+
+class DistanceField:
+    """
+    Breadth-first distance from every tile to the nearest source tile.
+
+    Once built, "which way to the nearest source" is a constant-time
+    lookup of the four neighbouring cells, no matter how many tiles or
+    sources the map has.
+    """
+
+    def __init__(self, height, width, sources, walkable):
+        self.height = height
+        self.width = width
+        self.walkable = walkable
+        self.dist = array('i', [UNREACHABLE]) * (height * width)
+        self.rebuild(sources)
+
+    def rebuild(self, sources):
+        dist = self.dist
+        for i in range(len(dist)):
+            dist[i] = UNREACHABLE
+        queue = deque()
+        for r, c in sources:
+            dist[r * self.width + c] = 0
+            queue.append((r, c))
+        self._flood(queue)
+
+    def add_source(self, r, c):
+        """
+        Make (r, c) a source and relax only the tiles that got closer.
+        """
+        self.dist[r * self.width + c] = 0
+        self._flood(deque([(r, c)]))
+
+    def open_tile(self, r, c):
+        """
+        (r, c) just became walkable: derive its distance from its
+        neighbours and relax outward from it.
+        """
+        best = UNREACHABLE
+        for nr, nc in self._neighbors(r, c):
+            d = self.dist[nr * self.width + nc]
+            if d != UNREACHABLE and (best == UNREACHABLE or d + 1 < best):
+                best = d + 1
+        if best != UNREACHABLE:
+            self.dist[r * self.width + c] = best
+            self._flood(deque([(r, c)]))
+
+    def distance(self, r, c):
+        return self.dist[r * self.width + c]
+
+    def next_step(self, r, c):
+        """
+        Return the neighbouring (row, col) one step closer to the nearest
+        source, or None if (r, c) is a source or nothing is reachable.
+        """
+        here = self.dist[r * self.width + c]
+        if here == 0:
+            return None
+        best = None
+        best_dist = here
+        for nr, nc in self._neighbors(r, c):
+            d = self.dist[nr * self.width + nc]
+            if d != UNREACHABLE and (best_dist == UNREACHABLE or d < best_dist):
+                best = (nr, nc)
+                best_dist = d
+        return best
+
+    def _neighbors(self, r, c):
+        for dr, dc in NEIGHBORS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.height and 0 <= nc < self.width:
+                yield nr, nc
+
+    def _flood(self, queue):
+        dist, width, walkable = self.dist, self.width, self.walkable
+        while queue:
+            r, c = queue.popleft()
+            d = dist[r * width + c] + 1
+            for nr, nc in self._neighbors(r, c):
+                i = nr * width + nc
+                if (dist[i] == UNREACHABLE or d < dist[i]) and walkable(nr, nc):
+                    dist[i] = d
+                    queue.append((nr, nc))
+
+
+class LandmarkFields:
+    """
+    One cached DistanceField per landmark type (e.g. 'T' or 'D').
+
+    Fields are built on first use. set_tile() keeps them up to date:
+    adding a landmark or opening a tile only relaxes the affected area,
+    while removing a landmark or blocking a tile marks the field dirty so
+    it is rebuilt on the next query.
+    """
+
+    def __init__(self, game_map, floor='.'):
+        self.game_map = game_map
+        self.height = len(game_map)
+        self.width = len(game_map[0])
+        self.floor = floor
+        self.fields = {}
+        self.dirty = set()
+
+    def walkable(self, r, c):
+        return self.game_map[r][c] == self.floor
+
+    def sources(self, landmark):
+        return [(r, c) for r in range(self.height) for c in range(self.width)
+                if self.game_map[r][c] == landmark]
+
+    def field(self, landmark):
+        field = self.fields.get(landmark)
+        if field is None:
+            field = DistanceField(self.height, self.width,
+                                  self.sources(landmark), self.walkable)
+            self.fields[landmark] = field
+        elif landmark in self.dirty:
+            field.rebuild(self.sources(landmark))
+        self.dirty.discard(landmark)
+        return field
+
+    def next_step(self, landmark, r, c):
+        return self.field(landmark).next_step(r, c)
+
+    def set_tile(self, r, c, tile):
+        """
+        Change one map tile and update the cached fields incrementally.
+        """
+        old = self.game_map[r][c]
+        if old == tile:
+            return
+        self.game_map[r][c] = tile
+        for landmark, field in self.fields.items():
+            if landmark in self.dirty:
+                continue
+            if tile == landmark:
+                field.add_source(r, c)
+            elif old == landmark or old == self.floor:
+                # Shortest paths may have run through this tile
+                if field.distance(r, c) != UNREACHABLE:
+                    self.dirty.add(landmark)
+            elif tile == self.floor:
+                field.open_tile(r, c)
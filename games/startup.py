@@ -0,0 +1,47 @@
+import time
+
+# perf_counter() when the last game became ready to play, whether its
+# pygame display was already initialized by a previous game, and whether
+# the window had to change size
+ready_time = None
+display_reused = False
+window_resized = False
+
+# Called with no arguments as soon as a game is ready (set by the launcher)
+on_ready = None
+
+
+def mark_ready():
+    """
+    Record that the current game is ready to play.
+    """
+    global ready_time
+    ready_time = time.perf_counter()
+    if on_ready is not None:
+        on_ready()
+
+
+def open_window(size, caption):
+    """
+    Return a pygame display surface of the given size.
+
+    Only the display and font modules are initialized (the games use no
+    sound). An already initialized display is kept, so switching games
+    only resizes the existing window (or leaves it alone when the size
+    matches) instead of tearing it down and recreating it.
+    """
+    global display_reused, window_resized
+    import pygame
+
+    display_reused = pygame.display.get_init()
+    if not display_reused:
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+    screen = pygame.display.get_surface()
+    window_resized = screen is None or screen.get_size() != tuple(size)
+    if window_resized:
+        screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(caption)
+    return screen